@@ -0,0 +1,14 @@
+// Data that the server embedded in the page, so that the app does not have to
+// request it again when it starts. Each value is only used once, since it is
+// out of date after the first navigation.
+let data;
+
+export function takeBootstrapData(key) {
+  if (data === undefined) {
+    const element = document.getElementById("bootstrap-data");
+    data = element ? JSON.parse(element.textContent) : {};
+  }
+  const value = data[key];
+  delete data[key];
+  return value;
+}
@@ -1,4 +1,5 @@
 import { createRouter, createWebHistory } from "vue-router";
+import { takeBootstrapData } from "../bootstrap";
 import store from "../store";
 import ConfirmationRequired from "../views/ConfirmationRequired.vue";
 import ConfirmationSuccessful from "../views/ConfirmationSuccessful.vue";
@@ -113,6 +114,13 @@ router.beforeEach(async (to, from) => {
   if (to.name && to.name === from.name) {
     return;
   }
+  const csrfToken = takeBootstrapData("csrf_token");
+  const userData = takeBootstrapData("user");
+  if (csrfToken && userData) {
+    store.commit("setCSRFToken", csrfToken);
+    store.commit("updateUserData", userData);
+    return;
+  }
   await store.dispatch("setCSRFToken");
   await store.dispatch("updateUserData");
 });
@@ -9,10 +9,14 @@ function createURLParams(obj) {
   return params;
 }
 
+// Sent with every change that the app makes, so that the events of the changes
+// that this tab made itself can be ignored.
+export const tabId = Math.random().toString(36).slice(2);
+
 const state = {
   authenticated: localStorage.getItem("authenticated") || "",
   userData: {},
-  axiosConfig: { headers: { "X-CSRFToken": undefined } },
+  axiosConfig: { headers: { "X-CSRFToken": undefined, "X-Tab-Id": tabId } },
   errorMessage: "",
   route: undefined,
 };
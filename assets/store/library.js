@@ -1,4 +1,5 @@
 import axios from "axios";
+import { tabId } from "./auth";
 
 const bookmarkSaveErrorMessage =
   "Error saving bookmark. Please check the fields and try again.";
@@ -8,6 +9,10 @@ const listSaveErrorMessage =
 const state = {
   bookmarks: [],
   lists: [],
+  counts: {
+    lists: {},
+    unfiled: { bookmark_count: 0, unread_count: 0 },
+  },
   filters: {
     list: undefined,
     unread: undefined,
@@ -17,6 +22,14 @@ const state = {
   loading: false,
 };
 
+// The event stream of the user's changes, open while the library is shown.
+let eventSource;
+let refreshTimeout;
+let listsChanged = false;
+// Counts the requests for bookmarks, so that the rest of an older list is not
+// appended to a newer one.
+let bookmarksRequest = 0;
+
 const getters = {};
 
 const actions = {
@@ -32,6 +45,7 @@ const actions = {
     if (payload.search) {
       params.push(`search=${payload.search}`);
     }
+    bookmarksRequest += 1;
     return axios
       .get(`/api/bookmarks/${params ? `?${params.join("&")}` : ""}`)
       .then((response) => {
@@ -43,6 +57,74 @@ const actions = {
         commit("setLibraryError", "Error fetching data.");
       });
   },
+  appendBookmarks({ commit, dispatch }, url) {
+    // Follows the "next" links of a paginated list of bookmarks to the end.
+    const request = bookmarksRequest;
+    return axios
+      .get(url)
+      .then((response) => {
+        if (request !== bookmarksRequest) {
+          return response;
+        }
+        commit("appendBookmarks", response.data.results);
+        if (response.data.next) {
+          return dispatch("appendBookmarks", response.data.next);
+        }
+        return response;
+      })
+      .catch(() => {
+        commit("setLibraryError", "Error fetching data.");
+      });
+  },
+  updateCounts({ commit }) {
+    return axios
+      .get("/api/lists/counts/")
+      .then((response) => {
+        commit("updateCounts", response.data);
+        return response;
+      })
+      .catch(() => {
+        // The counts are only shown next to the lists, so the library can be used
+        // without them.
+      });
+  },
+  subscribeToEvents({ dispatch, state }) {
+    if (eventSource) {
+      return;
+    }
+    eventSource = new EventSource("/api/events/");
+    eventSource.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.origin === tabId) {
+        // This tab made the change and already shows it.
+        return;
+      }
+      listsChanged = listsChanged || event.model !== "bookmark";
+      // Changes made together, such as a batch in another tab, are fetched once.
+      clearTimeout(refreshTimeout);
+      refreshTimeout = setTimeout(() => {
+        if (listsChanged) {
+          dispatch("updateLists");
+          listsChanged = false;
+        }
+        dispatch("updateCounts");
+        dispatch("updateBookmarks", state.filters);
+      }, 250);
+    };
+  },
+  unsubscribeFromEvents() {
+    if (eventSource) {
+      eventSource.close();
+      eventSource = undefined;
+    }
+    clearTimeout(refreshTimeout);
+  },
+  suggestBookmarks(_, text) {
+    return axios
+      .get("/api/bookmarks/suggest/", { params: { q: text } })
+      .then((response) => response.data)
+      .catch(() => []);
+  },
   updateLists({ commit }) {
     return axios
       .get("/api/lists/")
@@ -107,12 +189,13 @@ const actions = {
         commit("setLibraryError", listSaveErrorMessage);
       });
   },
-  deleteBookmark({ commit, rootState }, bookmarkId) {
+  deleteBookmark({ commit, dispatch, rootState }, bookmarkId) {
     return axios
       .delete(`/api/bookmarks/${bookmarkId}/`, rootState.auth.axiosConfig)
       .then((response) => {
         commit("deleteBookmark", bookmarkId);
         commit("setLibraryError", "");
+        dispatch("updateCounts");
         return response;
       })
       .catch(() => {
@@ -137,19 +220,6 @@ const actions = {
         throw e;
       });
   },
-  markAsRead({ rootState }, bookmarkId) {
-    return axios
-      .patch(
-        `/api/bookmarks/${bookmarkId}/`,
-        { unread: false },
-        Object.assign({ timeout: 1000 }, rootState.auth.axiosConfig)
-      )
-      .catch(() => {
-        // There is no point displaying an error message since the method that
-        // called markAsRead should still go to the bookmark's url regardless of
-        // any error.
-      });
-  },
 };
 
 const mutations = {
@@ -157,9 +227,19 @@ const mutations = {
     state.bookmarks = payload.data;
     state.filters = payload.filters;
   },
+  appendBookmarks(state, data) {
+    state.bookmarks.push(...data);
+  },
   updateLists(state, data) {
     state.lists = data;
   },
+  updateCounts(state, data) {
+    const lists = {};
+    data.lists.forEach((counts) => {
+      lists[counts.id] = counts;
+    });
+    state.counts = { lists, unfiled: data.unfiled };
+  },
   deleteBookmark(state, bookmarkId) {
     state.bookmarks.splice(
       state.bookmarks.findIndex((i) => i.id === bookmarkId),
@@ -0,0 +1,81 @@
+"""
+Measures the time and number of queries taken to delete lists of different sizes,
+with and without their bookmarks, comparing List.delete() with Django's deletion
+collector that it replaces.
+
+Runs against a temporary test database, using the same settings as manage.py:
+
+    python benchmarks/list_delete.py [SIZE ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, models  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from bookmarker.models import Bookmark, List, User  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+
+
+def collector_delete(list_):
+    models.Model.delete(list_)
+
+
+def collector_delete_with_bookmarks(list_):
+    list_.bookmarks.all().delete()
+    models.Model.delete(list_)
+
+
+METHODS = [
+    ("keep bookmarks, collector", collector_delete),
+    ("keep bookmarks, List.delete", List.delete),
+    ("with bookmarks, collector", collector_delete_with_bookmarks),
+    ("with bookmarks, delete_with_bookmarks", List.delete_with_bookmarks),
+]
+
+
+def measure(user, size, method):
+    list_ = List.objects.create(user=user, name="Benchmark")
+    Bookmark.objects.bulk_create(
+        (
+            Bookmark(
+                user=user, name=f"Bookmark{i}", url="http://example.com", list=list_
+            )
+            for i in range(size)
+        ),
+        batch_size=5000,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        method(list_)
+        elapsed = time.perf_counter() - start
+    Bookmark.objects.filter(user=user).delete()
+    return elapsed, len(queries.captured_queries)
+
+
+def main(sizes):
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        user = User.objects.create_user("benchmark@example.com", "12345")
+        print(f"{'size':>8}  {'method':<40} {'seconds':>9} {'queries':>8}")
+        for size in sizes:
+            for name, method in METHODS:
+                elapsed, queries = measure(user, size, method)
+                print(f"{size:>8}  {name:<40} {elapsed:>9.4f} {queries:>8}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
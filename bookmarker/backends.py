@@ -0,0 +1,18 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+from bookmarker.models import User
+
+
+class CachedModelBackend(ModelBackend):
+    # Saving a user removes them from the cache (see User.forget). The timeout of the
+    # cache limits how long changes made without saving go unnoticed.
+    def get_user(self, user_id):
+        cache = caches["auth"]
+        key = User.get_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,48 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a link was shared and never change the page.
+TRACKING_PARAMS = {
+    "dclid",
+    "fbclid",
+    "gclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "msclkid",
+    "yclid",
+}
+DEFAULT_PORTS = {80, 443}
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name.startswith("utm_") or name in TRACKING_PARAMS
+
+
+def canonicalize_url(url):
+    # http is treated as https, and credentials, default ports, fragments, trailing
+    # slashes and tracking parameters are dropped.
+    parts = urlsplit(url.strip())
+    netloc = (parts.hostname or "").rstrip(".")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and port not in DEFAULT_PORTS:
+        netloc += f":{port}"
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(name)
+    ]
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def get_url_hash(url):
+    # Signed, to fit a bigint column.
+    digest = hashlib.sha256(canonicalize_url(url).encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
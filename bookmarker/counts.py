@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models import Count, Q
+
+from bookmarker.models import Bookmark, List, UnfiledBookmarkCount
+
+
+def recount_bookmarks(user_id):
+    # The counters are locked first, so the triggers of concurrent changes wait
+    # until the recount has committed.
+    with transaction.atomic():
+        UnfiledBookmarkCount.objects.get_or_create(user_id=user_id)
+        lists = list(
+            List.objects.select_for_update()
+            .filter(user_id=user_id)
+            .only("id", "bookmark_count", "unread_count")
+        )
+        unfiled = UnfiledBookmarkCount.objects.select_for_update().get(user_id=user_id)
+        counts = {
+            row["list_id"]: (row["count"], row["unread"])
+            for row in Bookmark.objects.filter(user_id=user_id)
+            .values("list_id")
+            .annotate(count=Count("id"), unread=Count("id", filter=Q(unread=True)))
+            .order_by()
+        }
+
+        changed = []
+        for counter in [*lists, unfiled]:
+            list_id = counter.id if isinstance(counter, List) else None
+            count, unread = counts.get(list_id, (0, 0))
+            if (counter.bookmark_count, counter.unread_count) != (count, unread):
+                counter.bookmark_count = count
+                counter.unread_count = unread
+                changed.append(counter)
+        fields = ["bookmark_count", "unread_count"]
+        List.objects.bulk_update(
+            [counter for counter in changed if counter is not unfiled], fields
+        )
+        if unfiled in changed:
+            unfiled.save(update_fields=fields)
+    return len(changed)
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from bookmarker.jobs import job
+from bookmarker.models import (
+    AccountDeletion,
+    Bookmark,
+    List,
+    Tombstone,
+    UnfiledBookmarkCount,
+    User,
+    UserDataVersion,
+)
+
+
+def delete_account(deletion, batch_size=1000, progress=None):
+    """
+    Deletes the bookmarks and then the lists of a user scheduled for deletion, at most
+    batch_size rows per transaction, so that no statement has to lock or load all of a
+    large account at once. The number of rows deleted is saved with each batch, and an
+    interrupted deletion resumes with whatever rows are left. The user is deleted
+    last, along with the AccountDeletion.
+    """
+    for model, counter in ((Bookmark, "bookmarks_deleted"), (List, "lists_deleted")):
+        while True:
+            with transaction.atomic():
+                batch = model.objects.filter(user_id=deletion.user_id).values("id")
+                count = (
+                    model.objects.filter(id__in=batch[:batch_size])
+                    .delete()[1]
+                    .get(model._meta.label, 0)
+                )
+                if count:
+                    updated = timezone.now()
+                    AccountDeletion.objects.filter(pk=deletion.pk).update(
+                        **{counter: F(counter) + count, "datetime_updated": updated}
+                    )
+                    setattr(deletion, counter, getattr(deletion, counter) + count)
+                    deletion.datetime_updated = updated
+            if count and progress is not None:
+                progress(deletion)
+            if count < batch_size:
+                break
+
+    with transaction.atomic():
+        User.objects.filter(id=deletion.user_id).delete()
+        User.forget(deletion.user_id)
+        UserDataVersion.objects.filter(user_id=deletion.user_id).delete()
+        UnfiledBookmarkCount.objects.filter(user_id=deletion.user_id).delete()
+        Tombstone.objects.filter(user_id=deletion.user_id).delete()
+
+
+@job
+def delete_scheduled_account(user_id):
+    deletion = AccountDeletion.objects.filter(user_id=user_id).first()
+    if deletion is not None:
+        delete_account(deletion)
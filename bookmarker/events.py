@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from importlib import import_module
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core import signals
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections, transaction
+from django.http.cookie import parse_cookie
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "bookmarker_events"
+# Tells clients to fetch their data again, since there are too many changes to send
+# one by one.
+CHANGED = {"type": "changed"}
+# Longer IDs sent by clients are cut, since NOTIFY payloads are limited in size.
+MAX_ORIGIN_LENGTH = 64
+
+
+# Only reaches the streams of the process that published the event. Callbacks are
+# called in the publishing thread, so they must not block.
+class InProcessBroker:
+    def __init__(self):
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id, callback):
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(callback)
+
+    def unsubscribe(self, user_id, callback):
+        with self.lock:
+            callbacks = self.subscriptions.get(user_id, set())
+            callbacks.discard(callback)
+            if not callbacks:
+                self.subscriptions.pop(user_id, None)
+
+    def publish(self, user_id, event):
+        self.deliver(user_id, event)
+
+    def deliver(self, user_id, event):
+        with self.lock:
+            callbacks = list(self.subscriptions.get(user_id, ()))
+        for callback in callbacks:
+            callback(event)
+
+
+# Passes events between processes with NOTIFY. The first subscription starts a
+# thread that LISTENs on its own connection.
+class PostgresBroker(InProcessBroker):
+    poll_interval = 5
+    reconnect_delay = 5
+
+    def __init__(self, using="default"):
+        super().__init__()
+        self.using = using
+        self.listener = None
+        self.closed = threading.Event()
+
+    def publish(self, user_id, event):
+        payload = json.dumps(
+            {"user_id": user_id, "event": event}, cls=DjangoJSONEncoder
+        )
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+
+    def subscribe(self, user_id, callback):
+        super().subscribe(user_id, callback)
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, daemon=True)
+                self.listener.start()
+
+    def listen(self):
+        # Connections belong to the thread that opened them, so this one is only used
+        # for listening.
+        connection = connections[self.using]
+        while not self.closed.is_set():
+            try:
+                connection.ensure_connection()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                pg_connection = connection.connection
+                while not self.closed.is_set():
+                    select.select([pg_connection], [], [], self.poll_interval)
+                    pg_connection.poll()
+                    while pg_connection.notifies:
+                        message = json.loads(pg_connection.notifies.pop(0).payload)
+                        self.deliver(message["user_id"], message["event"])
+            except DatabaseError:
+                # Events published while reconnecting are lost, like those published
+                # while a client is reconnecting.
+                logger.exception("Listening for events failed")
+                connection.close()
+                self.closed.wait(self.reconnect_delay)
+        connection.close()
+
+    def close(self):
+        self.closed.set()
+        if self.listener is not None:
+            self.listener.join()
+
+
+broker = import_string(settings.EVENTS_BROKER)()
+
+
+# The app sends the ID of its tab with each request, so that the tab can ignore the
+# events of its own changes.
+def get_origin(request):
+    origin = request.headers.get("X-Tab-Id")
+    return origin[:MAX_ORIGIN_LENGTH] if origin else None
+
+
+def publish(user_id, event, origin=None):
+    if origin:
+        event = {**event, "origin": origin}
+    transaction.on_commit(lambda: broker.publish(user_id, event))
+
+
+# Clients fetch the data of events that are sent without it.
+def publish_change(user_id, change, model, object_id, data=None, origin=None):
+    event = {"type": change, "model": model, "id": object_id}
+    if data is not None:
+        event["data"] = data
+    publish(user_id, event, origin)
+
+
+def get_user_from_scope(scope):
+    # Closes connections older than CONN_MAX_AGE, like for any request.
+    signals.request_started.send(sender=EventStream, scope=scope)
+    try:
+        cookies = parse_cookie(
+            "; ".join(
+                value.decode("latin-1")
+                for name, value in scope.get("headers", ())
+                if name == b"cookie"
+            )
+        )
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore(cookies.get(settings.SESSION_COOKIE_NAME))
+        return get_user(SimpleNamespace(session=session))
+    finally:
+        signals.request_finished.send(sender=EventStream)
+
+
+# Each open stream is a coroutine waiting on a queue, so idle streams hold no thread
+# and no database connection. Every other request is passed to the application.
+class EventStream:
+    path = "/api/events/"
+    # Keeps proxies from closing idle connections.
+    heartbeat_interval = 30
+    max_queued_events = 100
+    # Milliseconds that browsers wait before reconnecting.
+    retry = 5000
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.application(scope, receive, send)
+            return
+        if scope["method"] != "GET":
+            await self.send_error(send, 405, "Method not allowed.")
+            return
+        user = await sync_to_async(get_user_from_scope)(scope)
+        if not (user.is_authenticated and user.is_confirmed):
+            await self.send_error(
+                send, 403, "Authentication credentials were not provided."
+            )
+            return
+        await self.stream(user.id, receive, send)
+
+    async def stream(self, user_id, receive, send):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.max_queued_events)
+
+        def put(event):
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                event = CHANGED
+            queue.put_nowait(event)
+
+        def callback(event):
+            loop.call_soon_threadsafe(put, event)
+
+        broker.subscribe(user_id, callback)
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect(receive))
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-store"),
+                        # Stops nginx from buffering the events.
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            body = f"retry: {self.retry}\n\n".encode()
+            while not disconnected.done():
+                await send(
+                    {"type": "http.response.body", "body": body, "more_body": True}
+                )
+                event = asyncio.ensure_future(queue.get())
+                await asyncio.wait(
+                    {event, disconnected},
+                    timeout=self.heartbeat_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if event.done():
+                    body = f"data: {json.dumps(event.result())}\n\n".encode()
+                else:
+                    event.cancel()
+                    body = b": heartbeat\n\n"
+        finally:
+            broker.unsubscribe(user_id, callback)
+            disconnected.cancel()
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    @staticmethod
+    async def send_error(send, status, detail):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": json.dumps({"detail": detail}).encode(),
+            }
+        )
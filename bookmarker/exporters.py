@@ -0,0 +1,104 @@
+import csv
+import json
+from html import escape
+
+from django.utils.timezone import now
+
+CHUNK_SIZE = 64 * 1024
+ITERATOR_CHUNK_SIZE = 2000
+FIELDS = ["id", "name", "url", "unread", "list"]
+
+
+def buffered(pieces, size=CHUNK_SIZE):
+    """
+    Joins many small strings into chunks of about the given size, so that a streaming
+    response is not written one row at a time.
+    """
+    buffer = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def iterate_rows(queryset):
+    # iterator() reads through a server-side cursor, so only one chunk of rows is held
+    # in memory at a time.
+    return queryset.values_list(
+        "id", "name", "url", "unread", "list_id", "datetime_created"
+    ).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+def export_json(queryset):
+    def pieces():
+        yield "["
+        separator = ""
+        for row in iterate_rows(queryset):
+            yield separator + json.dumps(dict(zip(FIELDS, row)))
+            separator = ","
+        yield "]"
+
+    return buffered(pieces())
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_csv(queryset):
+    writer = csv.writer(Echo())
+
+    def pieces():
+        yield writer.writerow(FIELDS)
+        for row in iterate_rows(queryset):
+            yield writer.writerow(row[:-1])
+
+    return buffered(pieces())
+
+
+def export_html(queryset, lists):
+    """
+    Writes the Netscape bookmark format that browsers import, with a folder for each
+    list. lists is a dict of list IDs to names.
+    """
+
+    def bookmark(row):
+        return (
+            f'    <DT><A HREF="{escape(row[2])}" '
+            f'ADD_DATE="{int(row[5].timestamp())}">{escape(row[1])}</A>\n'
+        )
+
+    def pieces():
+        yield (
+            "<!DOCTYPE NETSCAPE-Bookmark-file-1>\n"
+            '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+            "<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n"
+        )
+        current_list = None
+        timestamp = int(now().timestamp())
+        # Bookmarks are ordered by list with unfiled bookmarks last, so each list's
+        # folder only has to be opened once.
+        for row in iterate_rows(queryset.order_by("list", "name", "id")):
+            list_id = row[4]
+            if list_id != current_list:
+                if current_list is not None:
+                    yield "</DL><p>\n"
+                if list_id is not None:
+                    yield (
+                        f'<DT><H3 ADD_DATE="{timestamp}">'
+                        f"{escape(lists.get(list_id, ''))}</H3>\n<DL><p>\n"
+                    )
+                current_list = list_id
+            yield bookmark(row)
+        if current_list is not None:
+            yield "</DL><p>\n"
+        yield "</DL><p>\n"
+
+    return buffered(pieces())
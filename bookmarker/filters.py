@@ -0,0 +1,139 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import CharField, F, FloatField, Func, Q, Value
+from django.db.models.functions import Cast, Greatest
+from django.db.models.lookups import PostgresOperatorLookup
+from rest_framework import filters
+
+SEARCH_RANK = "search_rank"
+
+
+@CharField.register_lookup
+class ILikeContains(PostgresOperatorLookup):
+    """
+    Case-insensitive substring match written as ILIKE, which a trigram index on the
+    column can serve. The built-in icontains compares UPPER() of the column instead.
+    """
+
+    lookup_name = "ilike_contains"
+    postgres_operator = "ILIKE"
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", ["%" + connection.ops.prep_for_like_query(value) + "%"]
+
+
+@CharField.register_lookup
+class ILikeStartsWith(PostgresOperatorLookup):
+    """
+    Case-insensitive prefix match written as ILIKE, which a trigram index on the
+    column can serve.
+    """
+
+    lookup_name = "ilike_startswith"
+    postgres_operator = "ILIKE"
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", [connection.ops.prep_for_like_query(value) + "%"]
+
+
+@CharField.register_lookup
+class TrigramWordSimilar(PostgresOperatorLookup):
+    """
+    True when the value is similar to some part of the column. Unlike the similarity
+    used by trigram_similar, this does not penalize long names and URLs.
+    """
+
+    lookup_name = "trigram_word_similar"
+    postgres_operator = "%%>"
+
+
+class WordSimilarity(Func):
+    function = "WORD_SIMILARITY"
+    output_field = FloatField()
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for SearchFilter that matches the "search" query parameter
+    against a view's indexed search vector instead of running LIKE over each of the
+    search fields. Every word in the query has to match the start of a word in the
+    indexed text, so results update as the user types. Single characters have to
+    match a whole word, since nearly every word starts with one.
+
+    With "search_mode=fuzzy", the query is instead matched as a substring of, or as
+    being similar to, each of the search fields. This handles URL fragments and typos
+    and is served by trigram indexes on those fields.
+
+    Views without a "search_vector_field" are handled by SearchFilter as before.
+    """
+
+    search_config = "simple"
+    min_prefix_length = 2
+    search_mode_param = "search_mode"
+
+    def get_search_query(self, request):
+        terms = re.findall(r"[^\W_]+", request.query_params.get(self.search_param, ""))
+        if not terms:
+            return None
+        return SearchQuery(
+            " & ".join(
+                term.lower() + (":*" if len(term) >= self.min_prefix_length else "")
+                for term in terms
+            ),
+            config=self.search_config,
+            search_type="raw",
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        vector_field = getattr(view, "search_vector_field", None)
+        if vector_field is None:
+            return super().filter_queryset(request, queryset, view)
+        if request.query_params.get(self.search_mode_param) == "fuzzy":
+            return self.filter_fuzzy(request, queryset, view)
+
+        query = self.get_search_query(request)
+        if query is None:
+            return queryset
+        # The rank is cast to double precision so that it survives being written to a
+        # pagination cursor and compared again.
+        return queryset.filter(**{vector_field: query}).annotate(
+            **{
+                SEARCH_RANK: Cast(
+                    SearchRank(F(vector_field), query), output_field=FloatField()
+                )
+            }
+        )
+
+    def filter_fuzzy(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").strip()
+        search_fields = self.get_search_fields(view, request)
+        if not term or not search_fields:
+            return queryset
+
+        condition = Q()
+        similarities = []
+        for field in search_fields:
+            condition |= Q(**{f"{field}__ilike_contains": term})
+            condition |= Q(**{f"{field}__trigram_word_similar": term})
+            similarities.append(WordSimilarity(Value(term), F(field)))
+        similarity = (
+            Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        )
+        return queryset.filter(condition).annotate(
+            **{SEARCH_RANK: Cast(similarity, output_field=FloatField())}
+        )
+
+
+class OrderingFilter(filters.OrderingFilter):
+    """
+    Orders search results by relevance unless the client asked for an ordering.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if SEARCH_RANK in queryset.query.annotations and not request.query_params.get(
+            self.ordering_param
+        ):
+            return ["-" + SEARCH_RANK, *(ordering or [])]
+        return ordering
@@ -0,0 +1,23 @@
+import math
+from datetime import timedelta
+
+HALF_LIFE = timedelta(days=30)
+# Rate at which the weight of a visit decays, per day.
+DECAY_RATE = math.log(2) / (HALF_LIFE / timedelta(days=1))
+
+
+def to_days(datetime):
+    return datetime.timestamp() / 86400
+
+
+def combine(*frecencies):
+    # Subtracting the highest keeps exp() from overflowing.
+    highest = max(frecencies)
+    total = sum(math.exp(DECAY_RATE * (frecency - highest)) for frecency in frecencies)
+    return highest + math.log(total) / DECAY_RATE
+
+
+# The frecency is the day at which the decayed weights of the visits added up to 1.
+# All scores decay at the same rate, so it never has to be recomputed.
+def get_frecency(datetimes):
+    return combine(*(to_days(datetime) for datetime in datetimes))
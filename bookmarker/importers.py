@@ -0,0 +1,217 @@
+import codecs
+from html.parser import HTMLParser
+
+import ijson
+from django.db import transaction
+from rest_framework import serializers
+
+from bookmarker.models import Bookmark, List
+from bookmarker.serializers import BookmarkSerializer
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Folder:
+    def __init__(self, name):
+        self.name = name
+        self.list = None
+
+
+class BookmarkImporter:
+    """
+    Imports bookmarks from a browser export into a user's library without holding the
+    whole export in memory. Bookmarks are validated with BookmarkSerializer and then
+    inserted in batches, each batch in its own transaction. Every folder containing
+    bookmarks becomes a list, and bookmarks outside of any folder are put into
+    default_list.
+
+    Both Netscape bookmark HTML and the JSON formats of Chrome and Firefox are read.
+    """
+
+    default_folder_name = "Imported bookmarks"
+
+    def __init__(self, user, default_list=None, batch_size=1000, progress=None):
+        self.user = user
+        self.batch_size = batch_size
+        self.progress = progress
+        self.lists = {}
+        self.folders = []
+        self.batch = []
+        self.created = 0
+        self.skipped = 0
+        self.lists_created = 0
+
+        self.serializer = BookmarkSerializer(
+            context={"user": user, "lists": self.lists}
+        )
+        if default_list is not None:
+            # Raises a ValidationError if the list belongs to another user.
+            default_list = self.serializer.validate_list(default_list)
+            self.lists[default_list.id] = default_list
+        self.default_list = default_list
+
+    def import_file(self, file, file_format=None):
+        if file_format is None:
+            file_format = self.detect_format(file)
+        if file_format == "json":
+            try:
+                self.parse_json(file)
+            except ijson.JSONError as e:
+                raise ValueError(f"Invalid JSON: {e}") from e
+        elif file_format == "html":
+            self.parse_html(file)
+        else:
+            raise ValueError(f"Unknown format: {file_format}")
+        self.flush()
+        return self
+
+    @staticmethod
+    def detect_format(file):
+        start = file.read(512).lstrip(codecs.BOM_UTF8 + b" \t\r\n")
+        file.seek(0)
+        return "json" if start.startswith((b"{", b"[")) else "html"
+
+    def parse_html(self, file):
+        parser = NetscapeBookmarkParser(self)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+
+    def parse_json(self, file):
+        # Chrome uses name, url and children while Firefox uses title, uri and
+        # children. Chrome lists the children before the name of a folder, so folders
+        # are only named once they end.
+        containers = []
+        objects = []
+        for _, event, value in ijson.parse(file):
+            if event == "start_map":
+                containers.append("map")
+                objects.append({"key": None, "folder": None})
+            elif event == "end_map":
+                containers.pop()
+                item = objects.pop()
+                name = item.get("name", item.get("title"))
+                if item["folder"] is not None:
+                    self.end_folder(item["folder"], name)
+                elif item.get("url", item.get("uri")) is not None:
+                    self.add_bookmark(name, item.get("url", item.get("uri")))
+            elif event == "map_key":
+                objects[-1]["key"] = value
+            elif event == "start_array":
+                if containers and containers[-1] == "map":
+                    item = objects[-1]
+                    if item["key"] == "children":
+                        item["folder"] = self.start_folder(
+                            item.get("name", item.get("title"))
+                        )
+                containers.append("array")
+            elif event == "end_array":
+                containers.pop()
+            elif containers and containers[-1] == "map":
+                key = objects[-1]["key"]
+                if key in ("name", "title", "url", "uri") and isinstance(value, str):
+                    objects[-1][key] = value
+
+    def start_folder(self, name=None):
+        folder = Folder(name)
+        self.folders.append(folder)
+        return folder
+
+    def end_folder(self, folder, name=None):
+        self.folders.remove(folder)
+        name = (name or "").strip()[: List._meta.get_field("name").max_length]
+        if folder.list is not None and name and name != folder.list.name:
+            List.objects.filter(id=folder.list.id).update(name=name)
+            folder.list.name = name
+
+    def get_list(self):
+        if not self.folders:
+            return self.default_list
+        folder = self.folders[-1]
+        if folder.list is None:
+            name = (folder.name or "").strip() or self.default_folder_name
+            folder.list = List.objects.create(
+                user=self.user,
+                name=name[: List._meta.get_field("name").max_length],
+            )
+            self.lists[folder.list.id] = folder.list
+            self.lists_created += 1
+        return folder.list
+
+    def add_bookmark(self, name, url):
+        url = (url or "").strip()
+        name = (name or "").strip() or url
+        list_ = self.get_list()
+        data = {
+            "name": name[: Bookmark._meta.get_field("name").max_length],
+            "url": url,
+            "list": list_.id if list_ is not None else None,
+        }
+        try:
+            validated_data = self.serializer.run_validation(data)
+        except serializers.ValidationError:
+            self.skipped += 1
+            return
+        self.batch.append(Bookmark(user=self.user, **validated_data))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            with transaction.atomic():
+                Bookmark.objects.bulk_create(self.batch)
+            self.created += len(self.batch)
+            self.batch = []
+            if self.progress is not None:
+                self.progress(self)
+
+
+class NetscapeBookmarkParser(HTMLParser):
+    """
+    Reads the Netscape bookmark format exported by browsers, where each folder is an
+    <H3> heading followed by a <DL> of its contents, and each bookmark is an <A>.
+    """
+
+    def __init__(self, importer):
+        super().__init__(convert_charrefs=True)
+        self.importer = importer
+        self.folders = []
+        self.text = None
+        self.folder_name = None
+        self.href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "h3":
+            self.text = []
+        elif tag == "a":
+            self.href = dict(attrs).get("href")
+            self.text = []
+        elif tag == "dl":
+            if self.folder_name is not None:
+                self.folders.append(self.importer.start_folder(self.folder_name))
+                self.folder_name = None
+            else:
+                self.folders.append(None)
+
+    def handle_endtag(self, tag):
+        if tag == "h3" and self.text is not None:
+            self.folder_name = "".join(self.text)
+            self.text = None
+        elif tag == "a" and self.text is not None:
+            if self.href:
+                self.importer.add_bookmark("".join(self.text), self.href)
+            self.text = None
+            self.href = None
+        elif tag == "dl" and self.folders:
+            folder = self.folders.pop()
+            if folder is not None:
+                self.importer.end_folder(folder)
+
+    def handle_data(self, data):
+        if self.text is not None:
+            self.text.append(data)
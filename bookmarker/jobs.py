@@ -0,0 +1,123 @@
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from bookmarker.models import Job
+
+JOBS = {}
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+# Functions decorated with job can be queued with enqueue, usually inside the
+# transaction of the change that needs them. Arguments are saved as JSON.
+def job(func):
+    name = f"{func.__module__}.{func.__qualname__}"
+    JOBS[name] = func
+    func.job_name = name
+    return func
+
+
+def enqueue(func, *args, priority=0, run_at=None, max_attempts=3, **kwargs):
+    if getattr(func, "job_name", None) not in JOBS:
+        raise ValueError(f"{func!r} is not a job")
+    return Job.objects.create(
+        name=func.job_name,
+        args=list(args),
+        kwargs=kwargs,
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def get_job_function(name):
+    # Importing the module registers the jobs in it. Only registered functions are run,
+    # whatever name is saved in the table.
+    if name not in JOBS:
+        try:
+            import_string(name)
+        except ImportError:
+            pass
+    if name not in JOBS:
+        raise LookupError(f"No job named {name}")
+    return JOBS[name]
+
+
+def claim_job():
+    # Jobs locked by other workers are skipped, so any number of workers can run.
+    with transaction.atomic():
+        claimed = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=timezone.now())
+            .order_by("-priority", "run_at", "id")
+            .first()
+        )
+        if claimed is None:
+            return None
+        claimed.status = Job.RUNNING
+        claimed.attempts += 1
+        claimed.datetime_started = timezone.now()
+        claimed.datetime_finished = None
+        claimed.wait_time = max(claimed.datetime_started - claimed.run_at, timedelta())
+        claimed.run_time = None
+        claimed.save(
+            update_fields=[
+                "status",
+                "attempts",
+                "datetime_started",
+                "datetime_finished",
+                "wait_time",
+                "run_time",
+            ]
+        )
+    return claimed
+
+
+def get_retry_delay(attempts):
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def run_job(claimed):
+    # Runs outside of any transaction, so a long job holds no locks on the queue.
+    try:
+        get_job_function(claimed.name)(*claimed.args, **claimed.kwargs)
+    except Exception:  # pylint: disable=broad-except
+        claimed.last_error = traceback.format_exc()
+        claimed.status = (
+            Job.QUEUED if claimed.attempts < claimed.max_attempts else Job.FAILED
+        )
+    else:
+        claimed.status = Job.SUCCEEDED
+    claimed.datetime_finished = timezone.now()
+    claimed.run_time = claimed.datetime_finished - claimed.datetime_started
+    if claimed.status == Job.QUEUED:
+        claimed.run_at = claimed.datetime_finished + get_retry_delay(claimed.attempts)
+    # Not saved if requeue_stale_jobs gave the job to another attempt meanwhile.
+    Job.objects.filter(
+        id=claimed.id, status=Job.RUNNING, datetime_started=claimed.datetime_started
+    ).update(
+        status=claimed.status,
+        run_at=claimed.run_at,
+        last_error=claimed.last_error,
+        datetime_finished=claimed.datetime_finished,
+        run_time=claimed.run_time,
+    )
+    return claimed
+
+
+def requeue_stale_jobs(timeout):
+    # Jobs that ran for longer than timeout were most likely interrupted by their
+    # worker being killed.
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, datetime_started__lt=now - timeout)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        last_error=f"Did not finish within {timeout}",
+        datetime_finished=now,
+    )
+    return failed + stale.update(status=Job.QUEUED, run_at=now)
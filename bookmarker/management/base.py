@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+
+# Calls run_batch until it returns False, meaning that there is no work left, then
+# waits --interval seconds and starts again.
+class PollingCommand(BaseCommand):
+    default_interval = 5
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.description += " Runs until stopped unless --once is given."
+        return parser
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=self.default_interval,
+            help="Seconds to wait before checking for new work",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once there is no work left",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            if not self.run_batch(options):
+                if options["once"]:
+                    break
+                self.wait(options)
+
+    def run_batch(self, options):
+        raise NotImplementedError
+
+    def wait(self, options):
+        time.sleep(options["interval"])
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from bookmarker.deletion import delete_account
+from bookmarker.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the accounts that users have asked to delete, a batch of bookmarks "
+        "or lists at a time. Interrupted deletions are resumed on the next run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deletions = AccountDeletion.objects.select_related("user").order_by(
+            "datetime_requested"
+        )
+        count = 0
+        for deletion in deletions:
+            self.stdout.write(f"Deleting {deletion.user.email}...")
+            delete_account(
+                deletion,
+                batch_size=options["batch_size"],
+                progress=self.report_progress,
+            )
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} accounts"))
+
+    def report_progress(self, deletion):
+        self.stdout.write(
+            f"Deleted {deletion.bookmarks_deleted} bookmarks and "
+            f"{deletion.lists_deleted} lists..."
+        )
@@ -0,0 +1,17 @@
+from bookmarker.management.base import PollingCommand
+from bookmarker.visits import flush_visits
+
+
+class Command(PollingCommand):
+    help = "Adds recorded visits to the visit counts of bookmarks in batches."
+    default_interval = 10
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def run_batch(self, options):
+        visits, bookmarks = flush_visits(options["batch_size"])
+        if visits:
+            self.stdout.write(f"Added {visits} visits to {bookmarks} bookmarks")
+        return visits == options["batch_size"]
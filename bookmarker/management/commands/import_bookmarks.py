@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from bookmarker.importers import BookmarkImporter
+from bookmarker.models import List, User
+
+
+class Command(BaseCommand):
+    help = "Imports bookmarks from a browser export (Netscape HTML or JSON)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user to import bookmarks for")
+        parser.add_argument("path", help="Path of the exported bookmarks")
+        parser.add_argument(
+            "--format",
+            choices=["html", "json"],
+            help="Format of the export. Detected from the file if not given.",
+        )
+        parser.add_argument(
+            "--list",
+            type=int,
+            help="ID of the list for bookmarks that are not in any folder",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options["email"]).first()
+        if user is None:
+            raise CommandError(f"No user with email {options['email']}")
+        default_list = None
+        if options["list"] is not None:
+            default_list = List.objects.filter(id=options["list"]).first()
+            if default_list is None:
+                raise CommandError(f"No list with ID {options['list']}")
+
+        try:
+            importer = BookmarkImporter(
+                user,
+                default_list=default_list,
+                batch_size=options["batch_size"],
+                progress=self.report_progress,
+            )
+        except serializers.ValidationError as e:
+            raise CommandError(e.detail[0])
+
+        try:
+            with open(options["path"], "rb") as file:
+                importer.import_file(file, options["format"])
+        except (OSError, ValueError) as e:
+            raise CommandError(
+                f"{e} ({importer.created} bookmarks were imported before the error)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {importer.created} bookmarks into {importer.lists_created} "
+                f"new lists ({importer.skipped} skipped)"
+            )
+        )
+
+    def report_progress(self, importer):
+        self.stdout.write(f"Imported {importer.created} bookmarks...")
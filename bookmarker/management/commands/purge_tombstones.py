@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from bookmarker.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the records of deleted bookmarks and lists that are older than "
+        "SYNC_TOMBSTONE_DAYS. Clients that have not synced since then start over."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = purge_tombstones(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} tombstones"))
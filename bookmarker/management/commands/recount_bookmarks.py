@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from bookmarker.counts import recount_bookmarks
+from bookmarker.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts the bookmarks in every list again and corrects the counters that "
+        "have drifted. Each user is recounted in a separate transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="Only recount the bookmarks of this user")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("id")
+        if options["email"] is not None:
+            users = users.filter(email=options["email"])
+        corrected = 0
+        for user_id in users.values_list("id", flat=True).iterator():
+            count = recount_bookmarks(user_id)
+            if count:
+                self.stdout.write(f"Corrected {count} counters of user {user_id}")
+            corrected += count
+        self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} counters"))
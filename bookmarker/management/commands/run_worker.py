@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from bookmarker.jobs import claim_job, requeue_stale_jobs, run_job
+from bookmarker.management.base import PollingCommand
+from bookmarker.models import Job
+
+
+class Command(PollingCommand):
+    help = (
+        "Runs queued background jobs, highest priority first. Any number of workers "
+        "can run at once."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=3600,
+            help="Seconds after which a running job is assumed to have been "
+            "interrupted and is queued again",
+        )
+
+    def handle(self, *args, **options):
+        requeue_stale_jobs(timedelta(seconds=options["timeout"]))
+        super().handle(*args, **options)
+
+    def run_batch(self, options):
+        claimed = claim_job()
+        if claimed is None:
+            return False
+        self.report(run_job(claimed))
+        return True
+
+    def wait(self, options):
+        super().wait(options)
+        requeue_stale_jobs(timedelta(seconds=options["timeout"]))
+
+    def report(self, finished):
+        message = (
+            f"{finished.name} (job {finished.id}, attempt {finished.attempts}) "
+            f"{finished.status} in {finished.run_time.total_seconds():.3f}s "
+            f"after waiting {finished.wait_time.total_seconds():.3f}s"
+        )
+        if finished.status == Job.SUCCEEDED:
+            self.stdout.write(message)
+        else:
+            self.stderr.write(message + "\n" + finished.last_error)
@@ -0,0 +1,20 @@
+from bookmarker.management.base import PollingCommand
+from bookmarker.outbox import send_queued_emails
+
+
+class Command(PollingCommand):
+    help = (
+        "Sends queued emails in batches, reusing one connection to the SMTP server "
+        "for each batch."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def run_batch(self, options):
+        sent, failed = send_queued_emails(options["batch_size"])
+        if sent or failed:
+            self.stdout.write(f"Sent {sent} emails ({failed} failed)")
+        # A full batch means that there may be more emails waiting.
+        return sent + failed == options["batch_size"]
@@ -0,0 +1,62 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The name is weighted highest, followed by the parts of the URL's host and then the
+# rest of the URL. Punctuation is replaced with spaces before parsing so that hosts and
+# paths are split into separate words ("github.com/onstop4" -> github, com, onstop4).
+CREATE_SQL = """
+CREATE FUNCTION bookmarker_bookmark_search_vector(name text, url text)
+RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector('simple',
+            regexp_replace(coalesce(name, ''), '[^[:alnum:]]+', ' ', 'g')), 'A')
+        || setweight(to_tsvector('simple',
+            regexp_replace(coalesce(substring(url FROM '^[^:/]+://([^/?#]*)'), ''),
+                '[^[:alnum:]]+', ' ', 'g')), 'B')
+        || setweight(to_tsvector('simple',
+            regexp_replace(regexp_replace(coalesce(url, ''), '^[^:/]+://[^/?#]*', ''),
+                '[^[:alnum:]]+', ' ', 'g')), 'C')
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE FUNCTION bookmarker_bookmark_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := bookmarker_bookmark_search_vector(NEW.name, NEW.url);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookmarker_bookmark_search_vector_update
+BEFORE INSERT OR UPDATE OF name, url, search_vector ON bookmarker_bookmark
+FOR EACH ROW EXECUTE PROCEDURE bookmarker_bookmark_search_vector_trigger();
+"""
+
+DROP_SQL = """
+DROP TRIGGER bookmarker_bookmark_search_vector_update ON bookmarker_bookmark;
+DROP FUNCTION bookmarker_bookmark_search_vector_trigger();
+DROP FUNCTION bookmarker_bookmark_search_vector(text, text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0004_alter_emailconfirmationtoken_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookmark",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="bookmark_search_idx"
+            ),
+        ),
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, transaction
+
+BATCH_SIZE = 5000
+
+
+def backfill_search_vector(apps, schema_editor):
+    # Each batch is committed separately so that large tables are not locked for the
+    # whole backfill. Updating search_vector fires the trigger, which recomputes it.
+    connection = schema_editor.connection
+    while True:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE bookmarker_bookmark SET search_vector = NULL
+                    WHERE id IN (
+                        SELECT id FROM bookmarker_bookmark
+                        WHERE search_vector IS NULL
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    """,
+                    [BATCH_SIZE],
+                )
+                if cursor.rowcount < BATCH_SIZE:
+                    return
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("bookmarker", "0005_bookmark_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
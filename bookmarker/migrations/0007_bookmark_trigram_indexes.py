@@ -0,0 +1,30 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:08
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0006_backfill_bookmark_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="bookmark_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["url"], name="bookmark_url_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
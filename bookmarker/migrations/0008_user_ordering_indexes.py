@@ -0,0 +1,79 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0007_bookmark_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "name", "id"], name="bookmark_user_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "unread", "name", "id"],
+                name="bookmark_user_unread_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "list", "name", "id"],
+                name="bookmark_user_list_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                condition=models.Q(("unread", True)),
+                fields=["user", "name", "id"],
+                name="bookmark_unread_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="list",
+            index=models.Index(
+                fields=["user", "name", "id"], name="list_user_name_idx"
+            ),
+        ),
+        # The composite indexes above start with the user, so the foreign key indexes
+        # on the user are no longer needed.
+        migrations.AlterField(
+            model_name="bookmark",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="bookmarks",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="list",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="lists",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        # A list only ever belongs to one user, which the planner cannot know without
+        # these statistics. Otherwise, it multiplies the selectivities of both filters
+        # and expects far fewer rows than there are.
+        migrations.RunSQL(
+            "CREATE STATISTICS bookmark_user_list_stats (dependencies) "
+            "ON user_id, list_id FROM bookmarker_bookmark",
+            "DROP STATISTICS bookmark_user_list_stats",
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0008_user_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountDeletion",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="deletion",
+                        serialize=False,
+                        to="bookmarker.user",
+                    ),
+                ),
+                (
+                    "datetime_requested",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("datetime_updated", models.DateTimeField(blank=True, null=True)),
+                ("bookmarks_deleted", models.PositiveBigIntegerField(default=0)),
+                ("lists_deleted", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+# Statement level triggers see every row changed by a statement at once through
+# transition tables, so bulk inserts, updates and deletes increment each affected
+# user's version once per statement rather than once per row. Transition tables can
+# only be used by triggers for a single event, hence the three triggers per table.
+CREATE_FUNCTION_SQL = """
+CREATE FUNCTION bookmarker_increment_data_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO bookmarker_userdataversion (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM new_rows
+        ON CONFLICT (user_id)
+        DO UPDATE SET version = bookmarker_userdataversion.version + 1;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO bookmarker_userdataversion (user_id, version)
+        SELECT user_id, 1 FROM (
+            SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows
+        ) AS changed
+        ON CONFLICT (user_id)
+        DO UPDATE SET version = bookmarker_userdataversion.version + 1;
+    ELSE
+        INSERT INTO bookmarker_userdataversion (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM old_rows
+        ON CONFLICT (user_id)
+        DO UPDATE SET version = bookmarker_userdataversion.version + 1;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGERS_SQL = """
+CREATE TRIGGER {table}_data_version_insert
+AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE PROCEDURE bookmarker_increment_data_version();
+
+CREATE TRIGGER {table}_data_version_update
+AFTER UPDATE ON {table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE PROCEDURE bookmarker_increment_data_version();
+
+CREATE TRIGGER {table}_data_version_delete
+AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE PROCEDURE bookmarker_increment_data_version();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER {table}_data_version_insert ON {table};
+DROP TRIGGER {table}_data_version_update ON {table};
+DROP TRIGGER {table}_data_version_delete ON {table};
+"""
+
+TABLES = ["bookmarker_bookmark", "bookmarker_list"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0009_accountdeletion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserDataVersion",
+            fields=[
+                ("user_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunSQL(
+            CREATE_FUNCTION_SQL
+            + "".join(CREATE_TRIGGERS_SQL.format(table=table) for table in TABLES),
+            "".join(DROP_TRIGGERS_SQL.format(table=table) for table in TABLES)
+            + "DROP FUNCTION bookmarker_increment_data_version();",
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0010_userdataversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutgoingEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=300)),
+                ("body", models.TextField()),
+                ("from_email", models.CharField(max_length=300)),
+                ("to", models.CharField(max_length=300)),
+                (
+                    "datetime_created",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "datetime_next_attempt",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("datetime_sent", models.DateTimeField(blank=True, null=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="outgoingemail",
+            index=models.Index(
+                condition=models.Q(("datetime_sent", None)),
+                fields=["datetime_next_attempt"],
+                name="outgoingemail_unsent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations, transaction
+
+from bookmarker.canonical import get_url_hash
+
+BATCH_SIZE = 5000
+
+
+def backfill_url_hash(apps, schema_editor):
+    # Each batch is committed separately so that large tables are not locked for the
+    # whole backfill. Bookmarks are walked in order of their ids, so each batch starts
+    # where the last one ended.
+    Bookmark = apps.get_model("bookmarker", "Bookmark")
+    alias = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        with transaction.atomic(using=alias):
+            batch = list(
+                Bookmark.objects.using(alias)
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "url")[:BATCH_SIZE]
+            )
+            for bookmark in batch:
+                bookmark.url_hash = get_url_hash(bookmark.url)
+            Bookmark.objects.using(alias).bulk_update(batch, ["url_hash"])
+        if len(batch) < BATCH_SIZE:
+            return
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("bookmarker", "0013_bookmark_url_hash"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_url_hash, migrations.RunPython.noop),
+    ]
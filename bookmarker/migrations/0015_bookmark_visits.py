@@ -0,0 +1,59 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:47
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0014_backfill_bookmark_url_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookmarkVisit",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bookmark_id", models.BigIntegerField()),
+                ("datetime", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        # Visits are written on every click and only kept until they are flushed, so
+        # they skip the write-ahead log.
+        migrations.RunSQL(
+            "ALTER TABLE bookmarker_bookmarkvisit SET UNLOGGED;",
+            "ALTER TABLE bookmarker_bookmarkvisit SET LOGGED;",
+        ),
+        migrations.AddField(
+            model_name="bookmark",
+            name="datetime_last_visited",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="bookmark",
+            name="visit_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "visit_count", "id"], name="bookmark_user_visits_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "datetime_last_visited", "id"],
+                name="bookmark_user_visited_idx",
+            ),
+        ),
+    ]
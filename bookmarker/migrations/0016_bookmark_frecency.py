@@ -0,0 +1,24 @@
+# Generated by Django 3.2.6 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0015_bookmark_visits"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookmark",
+            name="frecency",
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "frecency", "id"], name="bookmark_user_frecency_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+import math
+
+from django.db import migrations, transaction
+
+from bookmarker.frecency import DECAY_RATE, combine, to_days
+
+BATCH_SIZE = 5000
+
+
+def get_frecency(bookmark):
+    # Only the time of the last visit is known, so all of the visits so far are
+    # counted as happening then.
+    frecencies = [to_days(bookmark.datetime_created)]
+    if bookmark.visit_count and bookmark.datetime_last_visited is not None:
+        frecencies.append(
+            to_days(bookmark.datetime_last_visited)
+            + math.log(bookmark.visit_count) / DECAY_RATE
+        )
+    return combine(*frecencies)
+
+
+def backfill_frecency(apps, schema_editor):
+    # Batched like the backfill of url_hash in 0014.
+    Bookmark = apps.get_model("bookmarker", "Bookmark")
+    alias = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        with transaction.atomic(using=alias):
+            batch = list(
+                Bookmark.objects.using(alias)
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "datetime_created", "visit_count", "datetime_last_visited")[
+                    :BATCH_SIZE
+                ]
+            )
+            for bookmark in batch:
+                bookmark.frecency = get_frecency(bookmark)
+            Bookmark.objects.using(alias).bulk_update(batch, ["frecency"])
+        if len(batch) < BATCH_SIZE:
+            return
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("bookmarker", "0016_bookmark_frecency"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_frecency, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 3.2.6 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+# Like the data version triggers of 0010, these are statement level triggers that
+# see all of the rows changed by a statement, so bulk queries are counted too. The
+# changes of a statement are added up per list (and per user for bookmarks without a
+# list) first, so each counter is written once, and not at all when the statement
+# left it unchanged, such as when only a bookmark's name was updated.
+APPLY_CHANGES_SQL = """
+        WITH changes AS (
+            SELECT list_id, user_id, SUM(count) AS count, SUM(unread) AS unread
+            FROM ({changes}) AS changed
+            GROUP BY list_id, user_id
+            HAVING SUM(count) <> 0 OR SUM(unread) <> 0
+        ), lists AS (
+            UPDATE bookmarker_list SET
+                bookmark_count = GREATEST(bookmarker_list.bookmark_count + changes.count, 0),
+                unread_count = GREATEST(bookmarker_list.unread_count + changes.unread, 0)
+            FROM changes
+            WHERE bookmarker_list.id = changes.list_id
+        )
+        INSERT INTO bookmarker_unfiledbookmarkcount (user_id, bookmark_count, unread_count)
+        SELECT user_id, count, unread FROM changes WHERE list_id IS NULL
+        ON CONFLICT (user_id) DO UPDATE SET
+            bookmark_count =
+                bookmarker_unfiledbookmarkcount.bookmark_count + EXCLUDED.bookmark_count,
+            unread_count =
+                bookmarker_unfiledbookmarkcount.unread_count + EXCLUDED.unread_count;
+"""
+
+ADDED_SQL = (
+    "SELECT list_id, user_id, 1 AS count, unread::integer AS unread FROM new_rows"
+)
+REMOVED_SQL = (
+    "SELECT list_id, user_id, -1 AS count, -unread::integer AS unread FROM old_rows"
+)
+
+CREATE_FUNCTION_SQL = f"""
+CREATE FUNCTION bookmarker_count_bookmarks() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+{APPLY_CHANGES_SQL.format(changes=ADDED_SQL)}
+    ELSIF TG_OP = 'UPDATE' THEN
+{APPLY_CHANGES_SQL.format(changes=ADDED_SQL + " UNION ALL " + REMOVED_SQL)}
+    ELSE
+{APPLY_CHANGES_SQL.format(changes=REMOVED_SQL)}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookmarker_bookmark_counts_insert
+AFTER INSERT ON bookmarker_bookmark REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE PROCEDURE bookmarker_count_bookmarks();
+
+CREATE TRIGGER bookmarker_bookmark_counts_update
+AFTER UPDATE ON bookmarker_bookmark
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE PROCEDURE bookmarker_count_bookmarks();
+
+CREATE TRIGGER bookmarker_bookmark_counts_delete
+AFTER DELETE ON bookmarker_bookmark REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE PROCEDURE bookmarker_count_bookmarks();
+"""
+
+DROP_FUNCTION_SQL = """
+DROP TRIGGER bookmarker_bookmark_counts_insert ON bookmarker_bookmark;
+DROP TRIGGER bookmarker_bookmark_counts_update ON bookmarker_bookmark;
+DROP TRIGGER bookmarker_bookmark_counts_delete ON bookmarker_bookmark;
+DROP FUNCTION bookmarker_count_bookmarks();
+"""
+
+# Bookmarks cannot be changed between counting them and the triggers taking over.
+BACKFILL_SQL = """
+LOCK TABLE bookmarker_bookmark IN SHARE MODE;
+
+UPDATE bookmarker_list
+SET bookmark_count = counts.count, unread_count = counts.unread
+FROM (
+    SELECT list_id, COUNT(*) AS count, COUNT(*) FILTER (WHERE unread) AS unread
+    FROM bookmarker_bookmark
+    WHERE list_id IS NOT NULL
+    GROUP BY list_id
+) AS counts
+WHERE bookmarker_list.id = counts.list_id;
+
+INSERT INTO bookmarker_unfiledbookmarkcount (user_id, bookmark_count, unread_count)
+SELECT user_id, COUNT(*), COUNT(*) FILTER (WHERE unread)
+FROM bookmarker_bookmark
+WHERE list_id IS NULL
+GROUP BY user_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0017_backfill_bookmark_frecency"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnfiledBookmarkCount",
+            fields=[
+                ("user_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("bookmark_count", models.BigIntegerField(default=0)),
+                ("unread_count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="list",
+            name="bookmark_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="list",
+            name="unread_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(CREATE_FUNCTION_SQL + BACKFILL_SQL, DROP_FUNCTION_SQL),
+    ]
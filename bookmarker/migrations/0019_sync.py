@@ -0,0 +1,150 @@
+# Generated by Django 3.2.6 on 2026-10-18 19:13
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# Before a row is changed, the trigger takes the user's sync lock (see
+# bookmarker.sync.lock_user) and only then stamps datetime_modified. The lock is held
+# until the transaction ends, so every later change of the user's data is stamped
+# after this one has committed, and a client that has seen a change has also seen
+# every change stamped before it. Updates that leave the serialized columns alone,
+# such as counting visits or bookmarks, take no lock and keep the old stamp.
+STAMP_FUNCTION_SQL = """
+CREATE FUNCTION {table}_stamp_modified() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_advisory_xact_lock(1, (OLD.user_id % 2147483647)::integer);
+        RETURN OLD;
+    END IF;
+    IF TG_OP = 'UPDATE' AND ({new_columns}) IS NOT DISTINCT FROM ({old_columns}) THEN
+        NEW.datetime_modified = OLD.datetime_modified;
+        RETURN NEW;
+    END IF;
+    PERFORM pg_advisory_xact_lock(1, (NEW.user_id % 2147483647)::integer);
+    NEW.datetime_modified = clock_timestamp();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {table}_stamp_modified
+BEFORE INSERT OR UPDATE OR DELETE ON {table}
+FOR EACH ROW EXECUTE PROCEDURE {table}_stamp_modified();
+
+CREATE TRIGGER {table}_tombstones
+AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE PROCEDURE bookmarker_insert_tombstones('{model}');
+"""
+
+# Deleted rows have already taken the lock in the row trigger above.
+TOMBSTONE_FUNCTION_SQL = """
+CREATE FUNCTION bookmarker_insert_tombstones() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO bookmarker_tombstone (user_id, model, object_id, datetime_deleted)
+    SELECT user_id, TG_ARGV[0], id, clock_timestamp() FROM old_rows;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+DROP_FUNCTION_SQL = """
+DROP TRIGGER {table}_stamp_modified ON {table};
+DROP TRIGGER {table}_tombstones ON {table};
+DROP FUNCTION {table}_stamp_modified();
+"""
+
+TABLES = [
+    ("bookmarker_bookmark", "bookmark", ["name", "url", "unread", "list_id"]),
+    ("bookmarker_list", "list", ["name"]),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarker", "0018_bookmark_counts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("user_id", models.BigIntegerField()),
+                (
+                    "model",
+                    models.CharField(
+                        choices=[("bookmark", "Bookmark"), ("list", "List")],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "datetime_deleted",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="bookmark",
+            name="datetime_modified",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="list",
+            name="datetime_modified",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "datetime_modified", "id"],
+                name="bookmark_user_modified_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="list",
+            index=models.Index(
+                fields=["user", "datetime_modified", "id"],
+                name="list_user_modified_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["user_id", "datetime_deleted", "id"],
+                name="tombstone_user_deleted_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["datetime_deleted"], name="tombstone_deleted_idx"
+            ),
+        ),
+        migrations.RunSQL(
+            TOMBSTONE_FUNCTION_SQL
+            + "".join(
+                STAMP_FUNCTION_SQL.format(
+                    table=table,
+                    model=model,
+                    new_columns=", ".join(f"NEW.{column}" for column in columns),
+                    old_columns=", ".join(f"OLD.{column}" for column in columns),
+                )
+                for table, model, columns in TABLES
+            ),
+            "".join(DROP_FUNCTION_SQL.format(table=table) for table, _, _ in TABLES)
+            + "DROP FUNCTION bookmarker_insert_tombstones();",
+        ),
+    ]
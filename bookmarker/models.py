@@ -1,8 +1,14 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.cache import caches
+from django.db import connections, models, router, transaction
 from django.utils import timezone
 
+from bookmarker.canonical import canonicalize_url, get_url_hash
+from bookmarker.frecency import get_frecency
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password, **extra_fields):
@@ -34,6 +40,39 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     objects = UserManager()
 
+    @staticmethod
+    def get_cache_key(user_id):
+        return f"user:{user_id}"
+
+    @classmethod
+    def forget(cls, user_id):
+        """
+        Removes the user from the cache of CachedModelBackend, so that the next request
+        loads them again, such as after they are confirmed, deactivated or change
+        their password. The entry is removed again once the transaction commits, in
+        case a request cached the old row in the meantime.
+        """
+        cache = caches["auth"]
+        key = cls.get_cache_key(user_id)
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        User.forget(self.id)
+
+    def schedule_deletion(self):
+        """
+        Deactivates the user, which logs them out everywhere, and leaves their
+        bookmarks and lists to be deleted in batches by the delete_accounts command.
+        """
+        with transaction.atomic():
+            User.objects.filter(id=self.id).update(is_active=False)
+            User.forget(self.id)
+            self.is_active = False
+            deletion = AccountDeletion.objects.get_or_create(user=self)[0]
+        return deletion
+
 
 class EmailConfirmationToken(models.Model):
     user = models.OneToOneField(
@@ -48,19 +87,312 @@ class EmailConfirmationToken(models.Model):
         return self.token
 
 
+class OutgoingEmail(models.Model):
+    """
+    An email waiting to be sent by the send_emails command. Emails are saved in the
+    same transaction as whatever caused them, so they are only sent if it commits.
+    """
+
+    subject = models.CharField(max_length=300)
+    body = models.TextField()
+    from_email = models.CharField(max_length=300)
+    to = models.CharField(max_length=300)
+    datetime_created = models.DateTimeField(default=timezone.now)
+    datetime_next_attempt = models.DateTimeField(default=timezone.now)
+    datetime_sent = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["datetime_next_attempt"],
+                condition=models.Q(datetime_sent=None),
+                name="outgoingemail_unsent_idx",
+            )
+        ]
+
+    def __str__(self):
+        return self.subject
+
+
+class Job(models.Model):
+    """
+    A call of a function registered with bookmarker.jobs.job, to be run by the
+    run_worker command once run_at has passed. Jobs with a higher priority run first.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    datetime_created = models.DateTimeField(default=timezone.now)
+    datetime_started = models.DateTimeField(null=True, blank=True)
+    datetime_finished = models.DateTimeField(null=True, blank=True)
+    # Timing of the latest attempt: how long the job waited after it was due and how
+    # long it ran.
+    wait_time = models.DurationField(null=True, blank=True)
+    run_time = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-priority", "run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="job_queued_idx",
+            ),
+            models.Index(
+                fields=["datetime_started"],
+                condition=models.Q(status="running"),
+                name="job_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+def get_update_fields(instance, update_fields):
+    """
+    Returns the fields that save() should write: all but the model's database_fields
+    when updating a row without being given update_fields.
+    """
+    if update_fields is not None or instance._state.adding:
+        return update_fields
+    return [
+        field.name
+        for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.database_fields
+    ]
+
+
+class UserDataVersion(models.Model):
+    """
+    A number that database triggers increment whenever any of a user's bookmarks or
+    lists are inserted, updated or deleted, including by bulk queries. Users that have
+    not written anything yet have no row and are at version 0.
+
+    user_id is not a foreign key, since the triggers also run when a user's bookmarks
+    are deleted along with the user.
+    """
+
+    user_id = models.BigIntegerField(primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    @classmethod
+    def get(cls, user_id):
+        return (
+            cls.objects.filter(user_id=user_id)
+            .values_list("version", flat=True)
+            .first()
+            or 0
+        )
+
+
+class UnfiledBookmarkCount(models.Model):
+    """
+    The number of a user's bookmarks that are not in any list, maintained by the same
+    triggers as List.bookmark_count. Like UserDataVersion, user_id is not a foreign
+    key, and users that never had such bookmarks have no row.
+    """
+
+    user_id = models.BigIntegerField(primary_key=True)
+    bookmark_count = models.BigIntegerField(default=0)
+    unread_count = models.BigIntegerField(default=0)
+
+
+class Tombstone(models.Model):
+    """
+    A deleted bookmark or list, kept for SYNC_TOMBSTONE_DAYS so that clients syncing
+    with /api/sync/ learn about the deletion (see bookmarker.sync). Tombstones are
+    inserted by database triggers (see migration 0019), so bookmarks and lists
+    deleted by bulk queries or along with their list or user are recorded too. Like
+    UserDataVersion, user_id is not a foreign key.
+    """
+
+    BOOKMARK = "bookmark"
+    LIST = "list"
+    MODEL_CHOICES = [(BOOKMARK, "Bookmark"), (LIST, "List")]
+
+    user_id = models.BigIntegerField()
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    datetime_deleted = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user_id", "datetime_deleted", "id"],
+                name="tombstone_user_deleted_idx",
+            ),
+            models.Index(fields=["datetime_deleted"], name="tombstone_deleted_idx"),
+        ]
+
+
+class AccountDeletion(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="deletion"
+    )
+    datetime_requested = models.DateTimeField(default=timezone.now)
+    datetime_updated = models.DateTimeField(null=True, blank=True)
+    bookmarks_deleted = models.PositiveBigIntegerField(default=0)
+    lists_deleted = models.PositiveBigIntegerField(default=0)
+
+
 class List(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="lists")
+    # Indexed by list_user_name_idx, which starts with the user.
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="lists", db_index=False
+    )
     name = models.CharField(max_length=300)
+    # Maintained by database triggers on the bookmark table (see migration 0018).
+    bookmark_count = models.PositiveIntegerField(default=0, editable=False)
+    unread_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set by a database trigger whenever the name changes (see migration 0019).
+    datetime_modified = models.DateTimeField(default=timezone.now, editable=False)
+
+    # Columns that are only written by the database, which save() leaves alone so
+    # that it cannot overwrite a concurrent change with the value it loaded.
+    database_fields = ["bookmark_count", "unread_count", "datetime_modified"]
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "name", "id"], name="list_user_name_idx"),
+            models.Index(
+                fields=["user", "datetime_modified", "id"],
+                name="list_user_modified_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = get_update_fields(self, kwargs.get("update_fields"))
+        super().save(*args, **kwargs)
 
     def delete_related_bookmarks(self):
-        self.bookmarks.all().delete()
+        return Bookmark.objects.filter(list_id=self.id).delete()
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        Deletes the list with one UPDATE that detaches its bookmarks and one DELETE,
+        instead of having Django's deletion collector load every bookmark in the list
+        and detach them 100 at a time. Only bookmarks reference lists, so nothing else
+        has to be collected.
+        """
+        using = using or router.db_for_write(List, instance=self)
+        with transaction.atomic(using=using):
+            Bookmark.objects.using(using).filter(list_id=self.id).update(list=None)
+            count = self.delete_row(using)
+        return count, {self._meta.label: count}
+
+    def delete_with_bookmarks(self):
+        using = router.db_for_write(List, instance=self)
+        with transaction.atomic(using=using):
+            bookmarks_deleted = self.delete_related_bookmarks()[0]
+            # There are no bookmarks left to detach.
+            lists_deleted = self.delete_row(using)
+        return bookmarks_deleted + lists_deleted, {
+            Bookmark._meta.label: bookmarks_deleted,
+            self._meta.label: lists_deleted,
+        }
+
+    def delete_row(self, using):
+        # pylint: disable=protected-access
+        count = List.objects.using(using).filter(id=self.id)._raw_delete(using)
+        self.id = None
+        return count
 
     def __str__(self):
         return self.name
 
 
+class BookmarkQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # Bulk inserts and updates bypass save(), which sets url_hash and frecency.
+        objs = list(objs)
+        for obj in objs:
+            obj.url_hash = get_url_hash(obj.url)
+            if obj.frecency is None:
+                obj.frecency = get_frecency([obj.datetime_created])
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if "url" in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.url_hash = get_url_hash(obj.url)
+            fields = [*fields, "url_hash"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def lock_url(self, url):
+        """
+        Takes a lock on the hash of the URL until the end of the transaction, so that
+        only one transaction at a time can check for and then save a bookmark of it.
+        """
+        with connections[self.db].cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [get_url_hash(url)])
+
+    def visit(self, bookmark_id):
+        """
+        Records a visit of the bookmark and marks it as read if it is in this
+        queryset, and returns its URL and whether it was marked as read, or None if it
+        is not in the queryset. This takes a single statement, which only writes to the
+        bookmark's row when it was unread. The visit is added to BookmarkVisit and
+        counted later by flush_visits.
+        """
+        sql, params = (
+            self.filter(id=bookmark_id)
+            .values("id", "url", "unread")
+            .query.sql_with_params()
+        )
+        table = self.model._meta.db_table
+        visit_table = BookmarkVisit._meta.db_table
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"WITH bookmark AS ({sql}), updated AS ("
+                f'UPDATE "{table}" SET "unread" = false WHERE "id" IN '
+                f'(SELECT "id" FROM bookmark WHERE "unread") RETURNING "id"'
+                f'), visit AS (INSERT INTO "{visit_table}" ("bookmark_id", "datetime") '
+                f'SELECT "id", statement_timestamp() FROM bookmark'
+                f') SELECT "url", EXISTS (SELECT 1 FROM updated) FROM bookmark',
+                params,
+            )
+            row = cursor.fetchone()
+        return tuple(row) if row else None
+
+    def find_url(self, url):
+        """
+        Returns the bookmarks whose URLs have the same canonical form as the given URL,
+        found by their url_hash.
+        """
+        canonical_url = canonicalize_url(url)
+        return [
+            bookmark
+            for bookmark in self.filter(url_hash=get_url_hash(url))
+            if canonicalize_url(bookmark.url) == canonical_url
+        ]
+
+
 class Bookmark(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="bookmarks")
+    # Indexed by bookmark_user_name_idx, which starts with the user.
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="bookmarks", db_index=False
+    )
     name = models.CharField(max_length=300)
     url = models.URLField(max_length=2000)
     unread = models.BooleanField(default=True)
@@ -68,6 +400,106 @@ class Bookmark(models.Model):
     list = models.ForeignKey(
         List, null=True, on_delete=models.SET_NULL, related_name="bookmarks"
     )
+    # Maintained by a database trigger from the name and url (see migration 0005), so
+    # it stays correct for bulk inserts and updates that bypass save().
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Hash of the canonical form of the url, for finding a user's bookmarks of the same
+    # page (see bookmarker.canonical).
+    url_hash = models.BigIntegerField(null=True, editable=False)
+    # Updated in batches from BookmarkVisit by flush_visits.
+    visit_count = models.PositiveIntegerField(default=0, editable=False)
+    datetime_last_visited = models.DateTimeField(null=True, editable=False)
+    # Combines how often and how recently the bookmark was visited (see
+    # bookmarker.frecency), counting saving the bookmark as its first visit.
+    frecency = models.FloatField(null=True, editable=False)
+    # Set by a database trigger whenever a serialized field changes (see migration
+    # 0019), but not when visits are counted.
+    datetime_modified = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = BookmarkQuerySet.as_manager()
+
+    database_fields = [
+        "visit_count",
+        "datetime_last_visited",
+        "frecency",
+        "datetime_modified",
+    ]
+
+    class Meta:
+        # The API always filters by user and orders by name, using the id as a
+        # tiebreaker when paginating. These indexes return rows in that order for each
+        # combination of the unread and list filters, so no sort is needed.
+        indexes = [
+            models.Index(fields=["user", "name", "id"], name="bookmark_user_name_idx"),
+            models.Index(
+                fields=["user", "unread", "name", "id"],
+                name="bookmark_user_unread_name_idx",
+            ),
+            models.Index(
+                fields=["user", "list", "name", "id"],
+                name="bookmark_user_list_name_idx",
+            ),
+            models.Index(
+                fields=["user", "name", "id"],
+                condition=models.Q(unread=True),
+                name="bookmark_unread_name_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="bookmark_search_idx"),
+            # Trigram indexes serve both substring (ILIKE) and similarity matches.
+            GinIndex(
+                fields=["name"],
+                opclasses=["gin_trgm_ops"],
+                name="bookmark_name_trgm_idx",
+            ),
+            GinIndex(
+                fields=["url"], opclasses=["gin_trgm_ops"], name="bookmark_url_trgm_idx"
+            ),
+            models.Index(
+                fields=["user", "url_hash"], name="bookmark_user_url_hash_idx"
+            ),
+            models.Index(
+                fields=["user", "visit_count", "id"],
+                name="bookmark_user_visits_idx",
+            ),
+            models.Index(
+                fields=["user", "datetime_last_visited", "id"],
+                name="bookmark_user_visited_idx",
+            ),
+            models.Index(
+                fields=["user", "frecency", "id"],
+                name="bookmark_user_frecency_idx",
+            ),
+            models.Index(
+                fields=["user", "datetime_modified", "id"],
+                name="bookmark_user_modified_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.url_hash = get_url_hash(self.url)
+        if self.frecency is None:
+            self.frecency = get_frecency([self.datetime_created])
+        update_fields = get_update_fields(self, kwargs.get("update_fields"))
+        if update_fields is not None and "url" in update_fields:
+            update_fields = [*update_fields, "url_hash"]
+        kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
+
+
+class BookmarkVisit(models.Model):
+    """
+    A visit of a bookmark through /go/<id>/ that has not been added to the bookmark's
+    visit_count yet. Visits are only ever inserted here, which takes no lock on the
+    bookmark, and flush_visits adds them to the bookmarks in batches.
+
+    The table is unlogged (see migration 0015), so visits that have not been flushed
+    are lost if the database crashes.
+    """
+
+    # Not a foreign key, which would lock the bookmark's row on every insert.
+    # Visits of deleted bookmarks are dropped when they are flushed.
+    bookmark_id = models.BigIntegerField()
+    datetime = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from bookmarker.models import OutgoingEmail
+
+MAX_ATTEMPTS = 10
+RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def queue_email(subject, body, from_email, to):
+    return OutgoingEmail.objects.create(
+        subject=subject, body=body, from_email=from_email, to=to
+    )
+
+
+def get_retry_delay(attempts):
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error) or type(error).__name__
+    email.datetime_next_attempt = timezone.now() + get_retry_delay(email.attempts)
+
+
+def send_queued_emails(batch_size=100, connection=None):
+    # Returns the number sent and failed. The batch stays locked while it is sent, so
+    # several senders can run at once without sending an email twice.
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                datetime_sent=None,
+                datetime_next_attempt__lte=timezone.now(),
+                attempts__lt=MAX_ATTEMPTS,
+            )
+            .order_by("datetime_next_attempt", "id")[:batch_size]
+        )
+        if not emails:
+            return 0, 0
+
+        sent = []
+        failed = []
+        if connection is None:
+            connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:  # pylint: disable=broad-except
+            for email in emails:
+                record_failure(email, e)
+            failed = emails
+        else:
+            try:
+                for email in emails:
+                    message = EmailMessage(
+                        email.subject,
+                        email.body,
+                        email.from_email,
+                        [email.to],
+                        connection=connection,
+                    )
+                    try:
+                        message.send()
+                    except Exception as e:  # pylint: disable=broad-except
+                        record_failure(email, e)
+                        failed.append(email)
+                    else:
+                        email.datetime_sent = timezone.now()
+                        sent.append(email)
+            finally:
+                connection.close()
+
+        OutgoingEmail.objects.bulk_update(sent, ["datetime_sent"])
+        OutgoingEmail.objects.bulk_update(
+            failed, ["attempts", "last_error", "datetime_next_attempt"]
+        )
+    return len(sent), len(failed)
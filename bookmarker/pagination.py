@@ -0,0 +1,195 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in cursor pagination that seeks from the last row of the previous page rather
+    than using OFFSET, so every page costs the same to fetch. The queryset's current
+    ordering is followed and "id" is always appended as a tiebreaker, which keeps the
+    ordering total even when several rows share the same name or url.
+
+    Pagination is only used when the "page_size" or "cursor" query parameter is
+    present. Otherwise, the full list is returned like before.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    default_page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (
+            self.cursor_query_param not in params
+            and self.page_size_query_param not in params
+        ):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        values, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self.invert(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(
+                self.get_seek_filter(ordering, values, self.get_nullable(queryset))
+            )
+
+        # Fetch one extra row so we know whether there is anything past this page.
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+        self.first_row = results[0] if results else None
+        self.last_row = results[-1] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        if page_size <= 0:
+            return self.default_page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = list(queryset.query.order_by) or list(getattr(view, "ordering", []))
+        ordering = [
+            field for field in ordering if field.lstrip("-") not in ("id", "pk")
+        ]
+        # The tiebreaker follows the direction of the last field so that a single
+        # index on (..., field, id) can serve the query in either direction.
+        descending = bool(ordering) and ordering[-1].startswith("-")
+        ordering.append("-id" if descending else "id")
+        return ordering
+
+    def get_nullable(self, queryset):
+        nullable = {
+            field.name for field in queryset.model._meta.concrete_fields if field.null
+        }
+        return {field.lstrip("-") for field in self.ordering} & nullable
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith("-") else "-" + field
+
+    @staticmethod
+    def get_seek_filter(ordering, values, nullable=()):
+        """
+        Builds the equivalent of the row comparison (a, b, id) > (x, y, z), expanded so
+        that each field can have its own direction. The redundant a >= x is added so
+        that the database can start the index scan at the cursor instead of filtering
+        out every row before it.
+
+        Fields named in nullable are ordered like PostgreSQL orders them, with nulls
+        after every value in ascending order and before every value in descending
+        order.
+        """
+        seek = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip("-")
+            descending = field.startswith("-")
+            if value is None:
+                after = Q(**{f"{name}__isnull": False}) if descending else Q(pk__in=[])
+                equal_value = Q(**{f"{name}__isnull": True})
+            else:
+                after = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+                if not descending and name in nullable:
+                    after |= Q(**{f"{name}__isnull": True})
+                equal_value = Q(**{name: value})
+            seek |= equal & after
+            equal &= equal_value
+        first = ordering[0]
+        name = first.lstrip("-")
+        if values[0] is None:
+            start = Q() if first.startswith("-") else Q(**{f"{name}__isnull": True})
+        elif first.startswith("-"):
+            start = Q(**{f"{name}__lte": values[0]})
+        else:
+            start = Q(**{f"{name}__gte": values[0]})
+            if name in nullable:
+                start |= Q(**{f"{name}__isnull": True})
+        return start & seek
+
+    def get_row_values(self, row):
+        values = [getattr(row, field.lstrip("-")) for field in self.ordering]
+        # DjangoJSONEncoder would cut datetimes down to milliseconds, which would no
+        # longer compare equal to the row's own value.
+        return [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ]
+
+    def encode_cursor(self, row, reverse):
+        payload = {"v": self.get_row_values(row)}
+        if reverse:
+            payload["r"] = 1
+        encoded = b64encode(
+            json.dumps(payload, cls=DjangoJSONEncoder).encode("utf-8")
+        ).decode("ascii")
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            values = payload["v"]
+            reverse = bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.encode_cursor(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.first_row, reverse=True)
@@ -9,14 +9,44 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "email", "is_confirmed"]
 
 
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Looks up related objects in a dict of primary keys to objects from the serializer
+    context, if there is one, so that many serializers can share a single query.
+    """
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        objects = self.context.get(self.context_key)
+        if objects is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return objects[int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
 class BookmarkSerializer(serializers.ModelSerializer):
+    list = PrefetchedPrimaryKeyRelatedField(
+        "lists", queryset=List.objects.all(), allow_null=True, required=False
+    )
+
     class Meta:
         model = Bookmark
         fields = ["id", "name", "url", "unread", "list"]
 
     def validate_list(self, value):
-        user = self.context["request"].user
-        if value is None or value.user == user:
+        # The user can be given directly when there is no request, such as when
+        # importing bookmarks from the command line.
+        user = self.context.get("user") or self.context["request"].user
+        if value is None or value.user_id == user.id:
             return value
         raise serializers.ValidationError("List does not belong to user")
 
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+
+class CappedTimeoutCache:
+    def __init__(self, cache, max_timeout):
+        self.cache = cache
+        self.max_timeout = max_timeout
+
+    def set(self, key, value, timeout=None):
+        if timeout is None or timeout > self.max_timeout:
+            timeout = self.max_timeout
+        self.cache.set(key, value, timeout)
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+
+class SessionStore(cached_db.SessionStore):
+    # Sessions are only cached for the timeout of the cache instead of until they
+    # expire. Logging out only ends them in every process if the cache is shared.
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        cache = self._cache
+        self._cache = CappedTimeoutCache(
+            cache, settings.CACHES[settings.SESSION_CACHE_ALIAS]["TIMEOUT"]
+        )
@@ -0,0 +1,177 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import Q
+
+# Sorts after any character that can appear in a key.
+MAX_CHARACTER = "\U0010ffff"
+MAX_INDEXED_BOOKMARKS = 20000
+# Cached instead of an index for libraries with more than MAX_INDEXED_BOOKMARKS.
+TOO_LARGE = object()
+
+
+def get_keys(name, url):
+    """
+    Returns the lowercase strings that a prefix has to match to suggest a bookmark:
+    its name from the start of each word, and the host of its URL with and without
+    "www.".
+    """
+    name = name.lower()
+    keys = {name[match.start() :] for match in re.finditer(r"\S+", name)}
+    host = urlsplit(url).hostname
+    if host:
+        keys.add(host)
+        if host.startswith("www."):
+            keys.add(host[4:])
+    return keys
+
+
+class SuggestionIndex:
+    """
+    All of the keys of a user's bookmarks in a sorted array, so that the keys starting
+    with a prefix are found with two binary searches. Matching bookmarks are ranked by
+    frecency.
+    """
+
+    def __init__(self, rows):
+        # rows are (id, name, url, frecency) tuples.
+        self.bookmarks = {}
+        entries = []
+        for bookmark_id, name, url, frecency in rows:
+            self.bookmarks[bookmark_id] = (name, url, frecency or 0.0)
+            entries.extend((key, bookmark_id) for key in get_keys(name, url))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = [bookmark_id for _, bookmark_id in entries]
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, queryset):
+        """
+        Returns the index of the bookmarks in the queryset, or TOO_LARGE if there are
+        more than MAX_INDEXED_BOOKMARKS of them.
+        """
+        rows = list(
+            queryset.values_list("id", "name", "url", "frecency")[
+                : MAX_INDEXED_BOOKMARKS + 1
+            ]
+        )
+        if len(rows) > MAX_INDEXED_BOOKMARKS:
+            return TOO_LARGE
+        return cls(rows)
+
+    def search(self, prefix, limit):
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + MAX_CHARACTER, start)
+        # The same order as -frecency, -id in the database.
+        ids = heapq.nlargest(
+            limit,
+            set(self.ids[start:end]),
+            key=lambda bookmark_id: (self.bookmarks[bookmark_id][2], bookmark_id),
+        )
+        return [
+            {
+                "id": bookmark_id,
+                "name": self.bookmarks[bookmark_id][0],
+                "url": self.bookmarks[bookmark_id][1],
+            }
+            for bookmark_id in ids
+        ]
+
+
+def search_queryset(queryset, prefix, limit):
+    """
+    Finds the same suggestions as SuggestionIndex.search with a query, which the
+    trigram indexes on the name and url can serve.
+    """
+    condition = Q(name__ilike_startswith=prefix) | Q(name__ilike_contains=" " + prefix)
+    # Anything after the host would match the rest of the URL instead.
+    if not re.search(r"[/?#@:]", prefix):
+        for start in ("http://", "https://", "http://www.", "https://www."):
+            condition |= Q(url__ilike_startswith=start + prefix)
+    return list(
+        queryset.filter(condition)
+        .order_by("-frecency", "-id")
+        .values("id", "name", "url")[:limit]
+    )
+
+
+class SuggestionCache:
+    """
+    Keeps the SuggestionIndex of the users that searched most recently in this
+    process, evicting the least recently used once the indexes have more than max_keys
+    keys in total. Each index is stored with the user's data version and is only used
+    while the version is unchanged, so any write to the user's bookmarks invalidates it.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_size(index):
+        # Entries without an index still take some memory.
+        return len(index) if isinstance(index, SuggestionIndex) else 1
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None:
+                self.entries.move_to_end(user_id)
+            return entry
+
+    def set(self, user_id, version, index):
+        with self.lock:
+            old_entry = self.entries.pop(user_id, None)
+            if old_entry is not None:
+                self.size -= self.get_size(old_entry[1])
+            self.entries[user_id] = (version, index)
+            self.size += self.get_size(index)
+            while self.size > self.max_keys:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= self.get_size(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+cache = SuggestionCache(settings.SUGGESTION_CACHE_MAX_KEYS)
+
+
+def suggest(queryset, user_id, version, prefix, limit):
+    """
+    Returns up to limit of the user's bookmarks whose name or host starts with the
+    prefix, most relevant first.
+
+    The index is only built by the second search with the same data version. The
+    first search after a write is answered by search_queryset, so that users who
+    search once do not pay for building an index that is never used again. Libraries
+    with more than MAX_INDEXED_BOOKMARKS bookmarks, or whose index would not fit in the
+    cache, are always searched with a query.
+    """
+    entry = cache.get(user_id)
+    if entry is None or entry[0] != version:
+        cache.set(user_id, version, None)
+        return search_queryset(queryset, prefix, limit)
+    index = entry[1]
+    if index is None:
+        index = SuggestionIndex.build(queryset)
+        # It would be evicted as soon as it is added.
+        if index is not TOO_LARGE and len(index) > cache.max_keys:
+            index = TOO_LARGE
+        cache.set(user_id, version, index)
+    if index is TOO_LARGE:
+        return search_queryset(queryset, prefix, limit)
+    return index.search(prefix, limit)
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from bookmarker.models import Bookmark, List, Tombstone
+from bookmarker.pagination import KeysetPagination
+
+# The order of changes with the same datetime.
+LIST, BOOKMARK, DELETED = 0, 1, 2
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Before every change.
+START = (EPOCH, LIST, 0)
+
+
+def get_tombstone_lifetime():
+    return timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+
+
+def to_microseconds(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_microseconds(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def make_token(position, issued):
+    stamp, kind, object_id = position
+    return f"{to_microseconds(stamp)}.{kind}.{object_id}.{to_microseconds(issued)}"
+
+
+def parse_token(token):
+    """
+    Returns the position and the issue time of a token made by make_token, or raises
+    ValueError if it is not one.
+    """
+    stamp, kind, object_id, issued = (int(value) for value in token.split("."))
+    if (
+        kind not in (LIST, BOOKMARK, DELETED)
+        or min(stamp, object_id, issued) < 0
+        or object_id >= 2**63
+    ):
+        raise ValueError(f"Invalid token: {token!r}")
+    try:
+        return (from_microseconds(stamp), kind, object_id), from_microseconds(issued)
+    except OverflowError as e:
+        raise ValueError(f"Invalid token: {token!r}") from e
+
+
+def is_expired(issued):
+    """
+    Returns whether tombstones that a client with a token issued at this time has not
+    seen may have been purged already.
+    """
+    return issued < timezone.now() - get_tombstone_lifetime()
+
+
+def lock_user(user_id):
+    """
+    Takes the user's sync lock in share mode until the end of the transaction. The
+    database triggers take it exclusively before changing any of the user's bookmarks
+    or lists (see migration 0019), so no change of the user can commit while it is
+    held.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock_shared(1, (%s %% 2147483647)::integer)",
+            [user_id],
+        )
+
+
+def get_after(field, kind, position):
+    # Changes of an earlier kind with the same datetime come before the position, and
+    # those of a later kind after it.
+    stamp, position_kind, object_id = position
+    if kind < position_kind:
+        return Q(**{f"{field}__gt": stamp})
+    if kind > position_kind:
+        return Q(**{f"{field}__gte": stamp})
+    return KeysetPagination.get_seek_filter([field, "id"], [stamp, object_id])
+
+
+def get_changes(user_id, position=START, limit=500):
+    """
+    Returns the first limit of the user's lists, bookmarks and tombstones that were
+    changed after the position, in the order they were changed, along with the
+    position of the last one and whether there are more.
+
+    Each kind is read with a range scan of its (user, datetime, id) index, while
+    holding the user's sync lock, so that the three queries see the same changes.
+    """
+    sources = [
+        (LIST, List.objects.filter(user_id=user_id), "datetime_modified"),
+        (BOOKMARK, Bookmark.objects.filter(user_id=user_id), "datetime_modified"),
+        (DELETED, Tombstone.objects.filter(user_id=user_id), "datetime_deleted"),
+    ]
+    changes = []
+    with transaction.atomic():
+        lock_user(user_id)
+        for kind, queryset, field in sources:
+            changes.extend(
+                ((getattr(obj, field), kind, obj.id), obj)
+                for obj in queryset.filter(get_after(field, kind, position)).order_by(
+                    field, "id"
+                )[: limit + 1]
+            )
+    changes.sort(key=lambda change: change[0])
+    more = len(changes) > limit
+    changes = changes[:limit]
+    if changes:
+        position = changes[-1][0]
+    return [obj for _, obj in changes], position, more
+
+
+def purge_tombstones(batch_size=1000):
+    """
+    Deletes tombstones older than the tombstone lifetime in batches and returns how
+    many were deleted.
+    """
+    before = timezone.now() - get_tombstone_lifetime()
+    total = 0
+    while True:
+        batch = Tombstone.objects.filter(datetime_deleted__lt=before).values("id")
+        count = Tombstone.objects.filter(id__in=batch[:batch_size]).delete()[0]
+        total += count
+        if count < batch_size:
+            return total
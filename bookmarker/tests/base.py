@@ -0,0 +1,26 @@
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from rest_framework.test import APITestCase
+
+from bookmarker.models import User
+
+
+class TwoUsersTestCase(APITestCase):
+    # user is logged in. user2 owns data that user must not see.
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test1@example.com", password="12345", is_confirmed=True
+        )
+        self.user2 = User.objects.create_user(
+            email="test2@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+
+
+def keep_test_connection(test_case):
+    # Like the test client, keep the connection of the test's transaction open when
+    # requests are made through the ASGI application.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    test_case.addCleanup(request_started.connect, close_old_connections)
+    test_case.addCleanup(request_finished.connect, close_old_connections)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Keeps the "auth" cache in memory while testing, so that tests do not write users
+    and sessions to the cache that servers share.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        auth_cache = {
+            **settings.CACHES["auth"],
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "auth",
+        }
+        self.auth_cache_settings = override_settings(
+            CACHES={**settings.CACHES, "auth": auth_cache}
+        )
+        self.auth_cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.auth_cache_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -6,19 +6,12 @@ from django.test.testcases import TestCase
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from bookmarker.models import Bookmark, List, User
+from bookmarker.models import AccountDeletion, Bookmark, Job, List, User
+from bookmarker.outbox import send_queued_emails
+from bookmarker.tests.base import TwoUsersTestCase
 
 
-class CreateModifyDeleteTests(APITestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email="test1@example.com", password="12345", is_confirmed=True
-        )
-        self.user2 = User.objects.create_user(
-            email="test2@example.com", password="12345", is_confirmed=True
-        )
-        self.client.force_login(self.user)
-
+class CreateModifyDeleteTests(TwoUsersTestCase):
     def test_bookmark_create(self):
         response = self.client.post(
             "/api/bookmarks/",
@@ -148,16 +141,7 @@ class CreateModifyDeleteTests(APITestCase):
         self.assertFalse(Bookmark.objects.filter(id=bookmark_id).exists())
 
 
-class GetTests(APITestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(
-            email="test1@example.com", password="12345", is_confirmed=True
-        )
-        self.user2 = User.objects.create_user(
-            email="test2@example.com", password="12345", is_confirmed=True
-        )
-        self.client.force_login(self.user)
-
+class GetTests(TwoUsersTestCase):
     def test_get_single_bookmark(self):
         response = self.client.post(
             "/api/bookmarks/",
@@ -376,11 +360,11 @@ class GetTests(APITestCase):
             name="Bookmark2", url="http://example.com/b/", user=self.user
         )
 
-        response = self.client.get("/api/bookmarks/?search=1")
+        response = self.client.get("/api/bookmarks/?search=bookmark1")
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["name"], "Bookmark1")
 
-        response = self.client.get("/api/bookmarks/?search=2")
+        response = self.client.get("/api/bookmarks/?search=Bookmark2")
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["name"], "Bookmark2")
 
@@ -528,6 +512,27 @@ class UserInfoTests(APITestCase):
         response = self.client.get("/api/user/")
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_delete_user(self):
+        user = User.objects.create_user(email="test@example.com", password="12345")
+        Bookmark.objects.create(user=user, name="Bookmark1", url="http://example.com")
+        self.client.force_login(user)
+
+        response = self.client.delete("/api/user/")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(AccountDeletion.objects.filter(user=user).exists())
+        self.assertEqual(
+            list(Job.objects.values_list("name", "args")),
+            [("bookmarker.deletion.delete_scheduled_account", [user.id])],
+        )
+        self.assertFalse(User.objects.get(id=user.id).is_active)
+        self.assertTrue(Bookmark.objects.filter(user=user).exists())
+
+        response = self.client.get("/api/user/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_login(user)
+        response = self.client.get("/api/user/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 
 class UserManagementTests(TestCase):
     def setUp(self):
@@ -566,6 +571,8 @@ class UserManagementTests(TestCase):
             format="json",
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        send_queued_emails()
         self.assertEqual(len(mail.outbox), 1)
         message_body = mail.outbox[0].body
 
@@ -617,11 +624,13 @@ class UserManagementTests(TestCase):
             format="json",
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        send_queued_emails()
         self.assertEqual(len(mail.outbox), 1)
         message1_body = mail.outbox[0].body
 
         response = self.client.post("/api/resend-confirmation/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        send_queued_emails()
         self.assertEqual(len(mail.outbox), 2)
         message2_body = mail.outbox[1].body
         self.assertEqual(message1_body, message2_body)
@@ -629,6 +638,7 @@ class UserManagementTests(TestCase):
     def test_bad_resend_confirmation(self):
         response = self.client.post("/api/resend-confirmation/")
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        send_queued_emails()
         self.assertEqual(len(mail.outbox), 0)
 
     def test_logout(self):
@@ -659,3 +669,113 @@ class UserManagementTests(TestCase):
     def test_bad_get_confirmed_status(self):
         response = self.client.get("/api/confirmed-status/")
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BatchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test1@example.com", password="12345", is_confirmed=True
+        )
+        self.user2 = User.objects.create_user(
+            email="test2@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+
+    def test_batch(self):
+        list1 = List.objects.create(name="List1", user=self.user)
+        list2 = List.objects.create(name="List2", user=self.user)
+        bookmark1 = Bookmark.objects.create(
+            name="Bookmark1", url="http://example.com", user=self.user
+        )
+        bookmark2 = Bookmark.objects.create(
+            name="Bookmark2", url="http://example.com", user=self.user
+        )
+        operations = [
+            {
+                "op": "create",
+                "data": {"name": "Bookmark3", "url": "http://example.com"},
+            },
+            {
+                "op": "create",
+                "data": {
+                    "name": "Bookmark4",
+                    "url": "http://example.com",
+                    "list": list1.id,
+                },
+            },
+            {"op": "update", "id": bookmark1.id, "data": {"list": list2.id}},
+            {"op": "update", "id": bookmark1.id, "data": {"unread": False}},
+            {"op": "delete", "id": bookmark2.id},
+        ]
+
+        # User, lists, bookmarks, savepoint, insert, update, delete and release of the
+        # savepoint. The session is cached when logging in.
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                "/api/bookmarks/batch/", operations, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results], [201, 201, 200, 200, 204]
+        )
+        self.assertEqual(results[1]["data"]["list"], list1.id)
+        self.assertTrue(
+            Bookmark.objects.filter(
+                id=results[1]["data"]["id"], name="Bookmark4", list=list1
+            ).exists()
+        )
+        bookmark1.refresh_from_db()
+        self.assertEqual(bookmark1.list, list2)
+        self.assertFalse(bookmark1.unread)
+        self.assertFalse(Bookmark.objects.filter(id=bookmark2.id).exists())
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 3)
+
+    def test_batch_all_or_nothing(self):
+        other_list = List.objects.create(name="List", user=self.user2)
+        other_bookmark = Bookmark.objects.create(
+            name="Bookmark", url="http://example.com", user=self.user2
+        )
+        operations = [
+            {
+                "op": "create",
+                "data": {"name": "Bookmark1", "url": "http://example.com"},
+            },
+            {
+                "op": "create",
+                "data": {
+                    "name": "Bookmark2",
+                    "url": "http://example.com",
+                    "list": other_list.id,
+                },
+            },
+            {"op": "create", "data": {"name": "Bookmark3", "url": "invalid"}},
+            {"op": "delete", "id": other_bookmark.id},
+            {"op": "move", "id": other_bookmark.id},
+        ]
+
+        response = self.client.post("/api/bookmarks/batch/", operations, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results], [424, 400, 400, 404, 400]
+        )
+        self.assertIn("list", results[1]["errors"])
+        self.assertIn("url", results[2]["errors"])
+        self.assertFalse(Bookmark.objects.filter(user=self.user).exists())
+        self.assertTrue(Bookmark.objects.filter(id=other_bookmark.id).exists())
+
+    def test_batch_invalid(self):
+        response = self.client.post(
+            "/api/bookmarks/batch/", {"op": "delete", "id": 1}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            "/api/bookmarks/batch/", [{"op": "delete", "id": 1}] * 1001, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.logout()
+        response = self.client.post("/api/bookmarks/batch/", [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,106 @@
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from bookmarker.models import EmailConfirmationToken, User
+from bookmarker.sessions import CappedTimeoutCache, SessionStore
+
+
+class AuthCacheTests(APITestCase):
+    def setUp(self):
+        caches["auth"].clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        self.client.login(email="test@example.com", password="12345")
+
+    def get_confirmed_status(self):
+        return self.client.get("/api/confirmed-status/")
+
+    def test_cached(self):
+        self.assertEqual(self.client.get("/api/lists/").status_code, 200)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get("/api/lists/").status_code, 200)
+        tables = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn('"django_session"', tables)
+        self.assertNotIn('"bookmarker_user"', tables)
+
+    def test_confirm(self):
+        self.user.is_confirmed = False
+        self.user.save()
+        self.assertFalse(self.get_confirmed_status().json()["detail"])
+        EmailConfirmationToken.objects.create(user=self.user, token="token")
+        self.client.get(f"/confirm/{self.user.id}/token/")
+        self.assertTrue(self.get_confirmed_status().json()["detail"])
+
+    def test_password_change(self):
+        self.assertEqual(self.get_confirmed_status().status_code, 200)
+        user = User.objects.get(id=self.user.id)
+        user.set_password("67890")
+        user.save()
+        self.assertEqual(self.get_confirmed_status().status_code, 403)
+
+    def test_schedule_deletion(self):
+        self.assertEqual(self.get_confirmed_status().status_code, 200)
+        self.user.schedule_deletion()
+        self.assertEqual(self.get_confirmed_status().status_code, 403)
+
+    def test_logout(self):
+        self.assertEqual(self.get_confirmed_status().status_code, 200)
+        session_key = self.client.session.session_key
+        self.client.logout()
+        self.client.cookies["sessionid"] = session_key
+        self.assertEqual(self.get_confirmed_status().status_code, 403)
+
+    def test_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            auth_cache = {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": directory,
+                "TIMEOUT": 60,
+            }
+            with override_settings(CACHES={**settings.CACHES, "auth": auth_cache}):
+                self.client.login(email="test@example.com", password="12345")
+                self.assertShared()
+
+    def assertShared(self):
+        # Another process has its own connection to the cache, which has to see the
+        # session and the user removed by this one.
+        other_cache = caches.create_connection("auth")
+
+        def load_session(session_key):
+            session = SessionStore(session_key)
+            session._cache = CappedTimeoutCache(other_cache, 60)
+            return session.load()
+
+        self.assertEqual(self.get_confirmed_status().status_code, 200)
+        session_key = self.client.session.session_key
+        self.assertEqual(load_session(session_key)[SESSION_KEY], str(self.user.id))
+        self.assertIsNotNone(other_cache.get(User.get_cache_key(self.user.id)))
+
+        self.user.set_password("67890")
+        self.user.save()
+        self.assertIsNone(other_cache.get(User.get_cache_key(self.user.id)))
+        self.client.logout()
+        self.assertEqual(load_session(session_key), {})
+
+
+class CappedTimeoutCacheTests(SimpleTestCase):
+    def test_set(self):
+        cache = mock.Mock()
+        capped = CappedTimeoutCache(cache, 60)
+        capped.set("key", "value", 3600)
+        cache.set.assert_called_with("key", "value", 60)
+        capped.set("key", "value", 10)
+        cache.set.assert_called_with("key", "value", 10)
+        capped.set("key", "value")
+        cache.set.assert_called_with("key", "value", 60)
+        capped.get("key")
+        cache.get.assert_called_with("key")
@@ -0,0 +1,124 @@
+import json
+import re
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+
+from bookmarker.models import Bookmark, List, User
+from bookmarker.views import MainView
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class BootstrapDataTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        self.list = List.objects.create(user=self.user, name="List1")
+        self.bookmark1, self.bookmark2 = Bookmark.objects.bulk_create(
+            [
+                Bookmark(user=self.user, name="Bookmark1", url="https://a.com"),
+                Bookmark(
+                    user=self.user,
+                    name="Bookmark2",
+                    url="https://b.com",
+                    list=self.list,
+                    unread=False,
+                ),
+            ]
+        )
+        self.client.force_login(self.user)
+
+    def get_data(self, path, params=None):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        match = re.search(
+            r'<script id="bootstrap-data" type="application/json">(.*?)</script>',
+            response.content.decode(),
+        )
+        return json.loads(match.group(1)) if match else None
+
+    def test_anonymous(self):
+        self.client.logout()
+        self.assertIsNone(self.get_data("/"))
+        self.assertIsNone(self.get_data("/app/"))
+
+    def test_unconfirmed(self):
+        self.user.is_confirmed = False
+        self.user.save()
+        data = self.get_data("/confirm/")
+        self.assertEqual(set(data), {"csrf_token", "user"})
+        self.assertFalse(data["user"]["is_confirmed"])
+
+    def test_library(self):
+        response = self.client.get("/app/")
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+        data = self.get_data("/app/")
+        self.assertEqual(data["user"], self.client.get("/api/user/").json())
+        self.assertEqual(data["lists"], self.client.get("/api/lists/").json())
+        self.assertEqual(data["counts"], self.client.get("/api/lists/counts/").json())
+        self.assertEqual(data["bookmarks"]["filters"], {})
+        self.assertEqual(
+            data["bookmarks"]["data"],
+            self.client.get("/api/bookmarks/", {"page_size": 100}).json(),
+        )
+
+    def test_first_page(self):
+        with mock.patch.object(MainView, "bookmarks_page_size", 1):
+            data = self.get_data("/app/")["bookmarks"]["data"]
+        self.assertEqual(len(data["results"]), 1)
+        response = self.client.get(data["next"])
+        self.assertEqual(
+            [
+                bookmark["id"]
+                for bookmark in data["results"] + response.json()["results"]
+            ],
+            [bookmark["id"] for bookmark in self.client.get("/api/bookmarks/").json()],
+        )
+
+    def test_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        self.client = client
+        data = self.get_data("/app/")
+        response = client.post(
+            "/api/lists/",
+            {"name": "List2"},
+            content_type="application/json",
+            HTTP_X_CSRFTOKEN=data["csrf_token"],
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_library_filters(self):
+        data = self.get_data("/app/", {"list": self.list.id})
+        self.assertEqual(data["bookmarks"]["filters"], {"list": str(self.list.id)})
+        self.assertEqual(
+            [bookmark["id"] for bookmark in data["bookmarks"]["data"]["results"]],
+            [self.bookmark2.id],
+        )
+        data = self.get_data("/app/", {"unread": "true", "search": ""})
+        self.assertEqual(data["bookmarks"]["filters"], {"unread": "true", "search": ""})
+        self.assertEqual(
+            [bookmark["id"] for bookmark in data["bookmarks"]["data"]["results"]],
+            [self.bookmark1.id],
+        )
+
+    def test_invalid_filter(self):
+        # The library requests the bookmarks itself when they could not be embedded.
+        data = self.get_data("/app/", {"list": "x"})
+        self.assertIsNone(data["bookmarks"]["data"])
+
+    def test_other_pages(self):
+        data = self.get_data("/app/create/")
+        self.assertIn("lists", data)
+        self.assertNotIn("bookmarks", data)
+
+    def test_conditional_request(self):
+        # The embedded responses are never replaced by 304 responses.
+        etag = self.client.get("/api/lists/")["ETag"]
+        response = self.client.get("/app/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(self.get_data("/app/")["lists"])
@@ -0,0 +1,124 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, Q
+
+from bookmarker.counts import recount_bookmarks
+from bookmarker.models import Bookmark, List, UnfiledBookmarkCount
+from bookmarker.tests.base import TwoUsersTestCase
+
+
+class CountTests(TwoUsersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.list1 = List.objects.create(user=self.user, name="List1")
+        self.list2 = List.objects.create(user=self.user, name="List2")
+
+    def get_counts(self):
+        response = self.client.get("/api/lists/counts/")
+        self.assertEqual(response.status_code, 200)
+        lists = {
+            item["id"]: (item["bookmark_count"], item["unread_count"])
+            for item in response.data["lists"]
+        }
+        unfiled = response.data["unfiled"]
+        return lists, (unfiled["bookmark_count"], unfiled["unread_count"])
+
+    def assertCounted(self):
+        counts = {
+            row["list_id"]: (row["count"], row["unread"])
+            for row in Bookmark.objects.filter(user=self.user)
+            .values("list_id")
+            .annotate(count=Count("id"), unread=Count("id", filter=Q(unread=True)))
+            .order_by()
+        }
+        lists, unfiled = self.get_counts()
+        self.assertEqual(
+            lists,
+            {
+                list_.id: counts.get(list_.id, (0, 0))
+                for list_ in List.objects.filter(user=self.user)
+            },
+        )
+        self.assertEqual(unfiled, counts.get(None, (0, 0)))
+
+    def test_counts(self):
+        self.assertEqual(
+            self.get_counts(), ({self.list1.id: (0, 0), self.list2.id: (0, 0)}, (0, 0))
+        )
+        Bookmark.objects.bulk_create(
+            Bookmark(
+                user=self.user,
+                name=f"Bookmark{i}",
+                url="https://example.com",
+                list=[self.list1, self.list2, None][i % 3],
+                unread=i % 2 == 0,
+            )
+            for i in range(10)
+        )
+        Bookmark.objects.create(user=self.user2, name="Other", url="https://a.com")
+        self.assertEqual(
+            self.get_counts(), ({self.list1.id: (4, 2), self.list2.id: (3, 1)}, (3, 2))
+        )
+
+        bookmark = Bookmark.objects.filter(list=self.list1).first()
+        response = self.client.patch(
+            f"/api/bookmarks/{bookmark.id}/",
+            {"list": self.list2.id, "unread": False},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertCounted()
+
+        response = self.client.post(
+            "/api/bookmarks/",
+            {"name": "New", "url": "https://example.com/new", "list": self.list1.id},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertCounted()
+
+        self.client.get(
+            f"/go/{response.data['id']}/", HTTP_SEC_FETCH_SITE="same-origin"
+        )
+        self.assertCounted()
+
+        Bookmark.objects.filter(user=self.user, unread=True).update(unread=False)
+        self.assertCounted()
+
+        self.client.delete(f"/api/lists/{self.list2.id}/")
+        self.assertCounted()
+
+        self.client.delete(f"/api/lists/{self.list1.id}/include-related/")
+        self.assertCounted()
+
+        Bookmark.objects.filter(user=self.user).delete()
+        self.assertEqual(self.get_counts(), ({}, (0, 0)))
+
+    def test_save_keeps_counters(self):
+        list1 = List.objects.get(id=self.list1.id)
+        Bookmark.objects.create(
+            user=self.user, name="Bookmark", url="https://example.com", list=list1
+        )
+        list1.name = "Renamed"
+        list1.save()
+        list1.refresh_from_db()
+        self.assertEqual(list1.name, "Renamed")
+        self.assertEqual((list1.bookmark_count, list1.unread_count), (1, 1))
+
+    def test_recount(self):
+        Bookmark.objects.bulk_create(
+            Bookmark(
+                user=self.user,
+                name=f"Bookmark{i}",
+                url="https://example.com",
+                list=self.list1 if i % 2 else None,
+            )
+            for i in range(4)
+        )
+        self.assertEqual(recount_bookmarks(self.user.id), 0)
+
+        List.objects.filter(id=self.list1.id).update(bookmark_count=10)
+        UnfiledBookmarkCount.objects.filter(user_id=self.user.id).delete()
+        stdout = StringIO()
+        call_command("recount_bookmarks", stdout=stdout)
+        self.assertIn(f"Corrected 2 counters of user {self.user.id}", stdout.getvalue())
+        self.assertCounted()
@@ -0,0 +1,73 @@
+from rest_framework import status
+
+from bookmarker.models import Bookmark, List, UserDataVersion
+from bookmarker.tests.base import TwoUsersTestCase
+
+
+class ConditionalGetTests(TwoUsersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.list = List.objects.create(user=self.user, name="List1")
+        self.bookmark = Bookmark.objects.create(
+            user=self.user, name="Bookmark1", url="http://example.com", list=self.list
+        )
+
+    def assertNotModified(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("no-cache", response["Cache-Control"])
+        etag = response["ETag"]
+        # Only the data version, since the session and user are cached.
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        return etag
+
+    def test_not_modified(self):
+        for url in (
+            "/api/bookmarks/",
+            "/api/bookmarks/?unread=true&ordering=-name",
+            f"/api/bookmarks/{self.bookmark.id}/",
+            "/api/lists/",
+            f"/api/lists/{self.list.id}/",
+        ):
+            with self.subTest(url=url):
+                self.assertNotModified(url)
+
+    def test_modified(self):
+        writes = [
+            lambda: self.client.post(
+                "/api/bookmarks/",
+                {"name": "Bookmark2", "url": "http://example.com"},
+                format="json",
+            ),
+            lambda: self.client.patch(
+                f"/api/lists/{self.list.id}/", {"name": "List2"}, format="json"
+            ),
+            lambda: Bookmark.objects.filter(user=self.user).update(unread=False),
+            lambda: Bookmark.objects.bulk_create(
+                [Bookmark(user=self.user, name="Bookmark3", url="http://example.com")]
+            ),
+            lambda: self.client.delete(f"/api/lists/{self.list.id}/include-related/"),
+        ]
+        for write in writes:
+            etag = self.assertNotModified("/api/bookmarks/")
+            write()
+            response = self.client.get("/api/bookmarks/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_other_users(self):
+        etag = self.assertNotModified("/api/lists/")
+        version = UserDataVersion.get(self.user.id)
+        List.objects.create(user=self.user2, name="List1")
+        self.assertEqual(UserDataVersion.get(self.user.id), version)
+        self.assertEqual(UserDataVersion.get(self.user2.id), 1)
+
+        response = self.client.get("/api/lists/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_login(self.user2)
+        response = self.client.get("/api/lists/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import queue
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TransactionTestCase
+from rest_framework.test import APITestCase
+
+from bookmarker.events import CHANGED, EventStream, InProcessBroker, PostgresBroker
+from bookmarker.models import Bookmark, List, User
+from bookmarker.serializers import BookmarkSerializer
+from bookmarker.tests.base import keep_test_connection
+
+
+async def not_found(scope, receive, send):
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class EventTests(APITestCase):
+    def setUp(self):
+        self.broker = InProcessBroker()
+        patcher = mock.patch("bookmarker.events.broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        self.list = List.objects.create(user=self.user, name="List1")
+        self.client.force_login(self.user)
+        self.events = []
+        self.broker.subscribe(self.user.id, self.events.append)
+
+    def test_viewset_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/bookmarks/", {"name": "New", "url": "https://example.com"}
+            )
+        bookmark_id = response.data["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/bookmarks/{bookmark_id}/", {"name": "Renamed"})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/bookmarks/{bookmark_id}/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/lists/{self.list.id}/", {"name": "Renamed"})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/bookmarks/batch/",
+                [{"op": "create", "data": {"name": "B", "url": "https://b.com"}}],
+                format="json",
+            )
+        self.assertEqual(
+            self.events,
+            [
+                {
+                    "type": "created",
+                    "model": "bookmark",
+                    "id": bookmark_id,
+                    "data": response.data,
+                },
+                {
+                    "type": "updated",
+                    "model": "bookmark",
+                    "id": bookmark_id,
+                    "data": {**response.data, "name": "Renamed"},
+                },
+                {"type": "deleted", "model": "bookmark", "id": bookmark_id},
+                {
+                    "type": "updated",
+                    "model": "list",
+                    "id": self.list.id,
+                    "data": {"id": self.list.id, "name": "Renamed"},
+                },
+                CHANGED,
+            ],
+        )
+
+    def test_quick_save_and_go(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(
+                "/https://example.com/page/", HTTP_SEC_FETCH_SITE="none"
+            )
+        self.assertEqual(response.status_code, 201)
+        bookmark = Bookmark.objects.get()
+        for _ in range(2):
+            # Only the first visit marks the bookmark as read.
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.get(
+                    f"/go/{bookmark.id}/", HTTP_SEC_FETCH_SITE="same-origin"
+                )
+        self.assertEqual(
+            self.events,
+            [
+                {
+                    "type": "created",
+                    "model": "bookmark",
+                    "id": bookmark.id,
+                    "data": BookmarkSerializer(bookmark).data,
+                },
+                {"type": "updated", "model": "bookmark", "id": bookmark.id},
+            ],
+        )
+
+    def test_origin(self):
+        # Events name the tab that made the change, so that it can ignore them.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f"/api/lists/{self.list.id}/", {"name": "Renamed"}, HTTP_X_TAB_ID="tab1"
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/bookmarks/batch/",
+                [{"op": "create", "data": {"name": "B", "url": "https://b.com"}}],
+                format="json",
+                HTTP_X_TAB_ID="x" * 100,
+            )
+        self.assertEqual(
+            self.events,
+            [
+                {
+                    "type": "updated",
+                    "model": "list",
+                    "id": self.list.id,
+                    "data": {"id": self.list.id, "name": "Renamed"},
+                    "origin": "tab1",
+                },
+                {**CHANGED, "origin": "x" * 64},
+            ],
+        )
+        self.assertNotIn("origin", CHANGED)
+
+    def test_rolled_back(self):
+        # Events are only published once the change commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/bookmarks/batch/",
+                [
+                    {"op": "create", "data": {"name": "B", "url": "https://b.com"}},
+                    {"op": "delete", "id": 0},
+                ],
+                format="json",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.events, [])
+
+    def test_other_user(self):
+        other = User.objects.create_user(
+            email="test2@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(other)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/bookmarks/", {"name": "New", "url": "https://example.com"}
+            )
+        self.assertEqual(self.events, [])
+
+    def test_without_asgi(self):
+        response = self.client.get("/api/events/")
+        self.assertEqual(response.status_code, 204)
+
+
+class EventStreamTests(APITestCase):
+    def setUp(self):
+        self.broker = InProcessBroker()
+        patcher = mock.patch("bookmarker.events.broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+        keep_test_connection(self)
+
+    def get_scope(self, path="/api/events/", method="GET"):
+        cookie = self.client.cookies.output(header="", sep=";").strip()
+        return {
+            "type": "http",
+            "path": path,
+            "method": method,
+            "headers": [(b"cookie", cookie.encode())],
+        }
+
+    def run_stream(self, scope, publish=(), max_queued_events=None):
+        """
+        Runs the stream until the events have been published and sent, then
+        disconnects and returns the messages that were sent.
+        """
+        messages = []
+
+        async def run():
+            disconnect = asyncio.Event()
+            started = asyncio.Event()
+
+            async def receive():
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                messages.append(message)
+                started.set()
+
+            stream = EventStream(not_found)
+            if max_queued_events is not None:
+                stream.max_queued_events = max_queued_events
+            task = asyncio.ensure_future(stream(scope, receive, send))
+            await asyncio.wait(
+                {task, asyncio.ensure_future(started.wait())},
+                timeout=5,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for event in publish:
+                self.broker.publish(self.user.id, event)
+            # Lets the stream send what was published.
+            for _ in range(len(publish) * 3 + 3):
+                await asyncio.sleep(0)
+            disconnect.set()
+            await asyncio.wait_for(task, timeout=5)
+
+        async_to_sync(run)()
+        return messages
+
+    def get_events(self, messages):
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        return [
+            json.loads(line[len("data: ") :])
+            for line in body.decode().splitlines()
+            if line.startswith("data: ")
+        ]
+
+    def test_stream(self):
+        messages = self.run_stream(self.get_scope(), [{"type": "a"}, {"type": "b"}])
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), messages[0]["headers"])
+        self.assertEqual(self.get_events(messages), [{"type": "a"}, {"type": "b"}])
+        # The subscription ends with the stream.
+        self.assertEqual(self.broker.subscriptions, {})
+
+    def test_overflow(self):
+        messages = self.run_stream(
+            self.get_scope(), [{"type": str(i)} for i in range(5)], max_queued_events=2
+        )
+        self.assertEqual(self.get_events(messages), [CHANGED])
+
+    def test_heartbeat(self):
+        with mock.patch.object(EventStream, "heartbeat_interval", 0):
+            messages = self.run_stream(self.get_scope())
+        self.assertIn(
+            b": heartbeat", b"".join(message.get("body", b"") for message in messages)
+        )
+
+    def test_not_logged_in(self):
+        self.client.logout()
+        messages = self.run_stream(self.get_scope())
+        self.assertEqual(messages[0]["status"], 403)
+        User.objects.filter(id=self.user.id).update(is_confirmed=False)
+        self.client.force_login(User.objects.get(id=self.user.id))
+        messages = self.run_stream(self.get_scope())
+        self.assertEqual(messages[0]["status"], 403)
+
+    def test_other_requests(self):
+        self.assertEqual(self.run_stream(self.get_scope("/api/"))[0]["status"], 404)
+        messages = self.run_stream(self.get_scope(method="POST"))
+        self.assertEqual(messages[0]["status"], 405)
+
+
+class PostgresBrokerTests(TransactionTestCase):
+    def test_publish(self):
+        broker = PostgresBroker()
+        broker.poll_interval = 0.1
+        received = queue.Queue()
+        broker.subscribe(1, received.put)
+        broker.subscribe(2, lambda event: self.fail("Delivered to another user"))
+        self.addCleanup(broker.close)
+        # The listener may not have started listening yet.
+        for _ in range(50):
+            broker.publish(1, {"type": "changed"})
+            try:
+                self.assertEqual(received.get(timeout=0.1), {"type": "changed"})
+                break
+            except queue.Empty:
+                pass
+        else:
+            self.fail("No event was delivered")
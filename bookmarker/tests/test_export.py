@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from bookmarker.importers import BookmarkImporter
+from bookmarker.models import Bookmark, List, User
+from bookmarker.tests.base import TwoUsersTestCase, keep_test_connection
+from project.asgi import application
+
+
+class ExportTests(TwoUsersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.list = List.objects.create(name="List <1>", user=self.user)
+        self.bookmark1 = Bookmark.objects.create(
+            name="Bookmark1", url="http://example.com/1/", user=self.user
+        )
+        self.bookmark2 = Bookmark.objects.create(
+            name='Bookmark2 "quoted" & more',
+            url="http://example.com/2/?a=1&b=2",
+            user=self.user,
+            list=self.list,
+            unread=False,
+        )
+        Bookmark.objects.create(
+            name="Bookmark3", url="http://example.com/3/", user=self.user2
+        )
+
+    def get_content(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            content = b"".join(response.streaming_content).decode()
+        # The bookmarks are read through a server-side cursor.
+        self.assertTrue(
+            any(
+                query["sql"].startswith("DECLARE") for query in queries.captured_queries
+            )
+        )
+        return response, content
+
+    def test_json(self):
+        response, content = self.get_content("/api/bookmarks/export/")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="bookmarks.json"'
+        )
+        self.assertEqual(
+            json.loads(content),
+            [
+                {
+                    "id": self.bookmark1.id,
+                    "name": "Bookmark1",
+                    "url": "http://example.com/1/",
+                    "unread": True,
+                    "list": None,
+                },
+                {
+                    "id": self.bookmark2.id,
+                    "name": 'Bookmark2 "quoted" & more',
+                    "url": "http://example.com/2/?a=1&b=2",
+                    "unread": False,
+                    "list": self.list.id,
+                },
+            ],
+        )
+
+        _, content = self.get_content(f"/api/bookmarks/export/?list={self.list.id}")
+        self.assertEqual(
+            [row["id"] for row in json.loads(content)], [self.bookmark2.id]
+        )
+
+    def test_csv(self):
+        _, content = self.get_content("/api/bookmarks/export/?format=csv")
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(
+            rows,
+            [
+                ["id", "name", "url", "unread", "list"],
+                [
+                    str(self.bookmark1.id),
+                    "Bookmark1",
+                    "http://example.com/1/",
+                    "True",
+                    "",
+                ],
+                [
+                    str(self.bookmark2.id),
+                    'Bookmark2 "quoted" & more',
+                    "http://example.com/2/?a=1&b=2",
+                    "False",
+                    str(self.list.id),
+                ],
+            ],
+        )
+
+    def test_html_round_trip(self):
+        _, content = self.get_content("/api/bookmarks/export/?format=html")
+        self.assertIn("<H3", content)
+
+        importer = BookmarkImporter(self.user2).import_file(
+            io.BytesIO(content.encode())
+        )
+        self.assertEqual(importer.created, 2)
+        self.assertEqual(
+            sorted(
+                (bookmark.name, bookmark.url, bookmark.list and bookmark.list.name)
+                for bookmark in Bookmark.objects.filter(user=self.user2).exclude(
+                    name="Bookmark3"
+                )
+            ),
+            [
+                ("Bookmark1", "http://example.com/1/", None),
+                (
+                    'Bookmark2 "quoted" & more',
+                    "http://example.com/2/?a=1&b=2",
+                    "List <1>",
+                ),
+            ],
+        )
+
+    def test_errors(self):
+        response = self.client.get("/api/bookmarks/export/?format=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.logout()
+        response = self.client.get("/api/bookmarks/export/?format=csv")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AsgiExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        Bookmark.objects.bulk_create(
+            Bookmark(name=f"Bookmark{i}", url="http://example.com/", user=self.user)
+            for i in range(3)
+        )
+        self.client.force_login(self.user)
+        keep_test_connection(self)
+
+    def test_export(self):
+        cookie = self.client.cookies.output(header="", sep=";").strip()
+        communicator = ApplicationCommunicator(
+            application,
+            {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": "/api/bookmarks/export/",
+                "root_path": "",
+                "query_string": b"format=csv",
+                "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+                "server": ("testserver", 80),
+            },
+        )
+
+        async def run():
+            await communicator.send_input({"type": "http.request"})
+            messages = [await communicator.receive_output(5)]
+            while True:
+                messages.append(await communicator.receive_output(5))
+                if not messages[-1].get("more_body"):
+                    break
+            await communicator.wait(5)
+            return messages
+
+        messages = async_to_sync(run)()
+        self.assertEqual(messages[0]["status"], status.HTTP_200_OK)
+        content = b"".join(message.get("body", b"") for message in messages[1:])
+        rows = csv.DictReader(io.StringIO(content.decode()))
+        self.assertEqual(
+            [row["name"] for row in rows], [f"Bookmark{i}" for i in range(3)]
+        )
@@ -0,0 +1,194 @@
+import json
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from bookmarker.importers import BookmarkImporter
+from bookmarker.models import Bookmark, List, User
+
+NETSCAPE_HTML = b"""<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1" PERSONAL_TOOLBAR_FOLDER="true">Bookmarks bar</H3>
+    <DL><p>
+        <DT><A HREF="https://www.python.org/" ADD_DATE="1">Python &amp; more</A>
+        <DT><H3 ADD_DATE="1">Django</H3>
+        <DL><p>
+            <DT><A HREF="https://www.djangoproject.com/">Django</A>
+            <DT><A HREF="javascript:alert(1)">Bookmarklet</A>
+        </DL><p>
+        <DT><H3 ADD_DATE="1">Empty</H3>
+        <DL><p>
+        </DL><p>
+    </DL><p>
+    <DT><A HREF="https://example.com/">Example</A>
+</DL><p>
+"""
+
+CHROME_JSON = {
+    "checksum": "0",
+    "roots": {
+        "bookmark_bar": {
+            "children": [
+                {"name": "Python", "type": "url", "url": "https://www.python.org/"},
+                {
+                    "children": [
+                        {
+                            "name": "Django",
+                            "type": "url",
+                            "url": "https://www.djangoproject.com/",
+                            "meta_info": {"name": "ignored"},
+                        }
+                    ],
+                    "name": "Django",
+                    "type": "folder",
+                },
+            ],
+            "name": "Bookmarks bar",
+            "type": "folder",
+        },
+        "other": {"children": [], "name": "Other bookmarks", "type": "folder"},
+    },
+    "version": 1,
+}
+
+FIREFOX_JSON = {
+    "title": "",
+    "type": "text/x-moz-place-container",
+    "root": "placesRoot",
+    "children": [
+        {
+            "title": "menu",
+            "type": "text/x-moz-place-container",
+            "children": [
+                {
+                    "title": "Python",
+                    "type": "text/x-moz-place",
+                    "uri": "https://www.python.org/",
+                },
+                {"title": "Recent", "type": "text/x-moz-place", "uri": "place:sort=8"},
+            ],
+        }
+    ],
+}
+
+
+class ImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test1@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+
+    def get_library(self):
+        return sorted(
+            (bookmark.name, bookmark.url, bookmark.list and bookmark.list.name)
+            for bookmark in Bookmark.objects.filter(user=self.user)
+        )
+
+    def test_netscape_html(self):
+        importer = BookmarkImporter(self.user).import_file(BytesIO(NETSCAPE_HTML))
+        self.assertEqual(
+            self.get_library(),
+            [
+                ("Django", "https://www.djangoproject.com/", "Django"),
+                ("Example", "https://example.com/", None),
+                ("Python & more", "https://www.python.org/", "Bookmarks bar"),
+            ],
+        )
+        self.assertEqual(importer.skipped, 1)
+        self.assertEqual(
+            sorted(List.objects.filter(user=self.user).values_list("name", flat=True)),
+            ["Bookmarks bar", "Django"],
+        )
+
+    def test_chrome_json(self):
+        file = BytesIO(json.dumps(CHROME_JSON).encode())
+        BookmarkImporter(self.user, batch_size=1).import_file(file)
+        self.assertEqual(
+            self.get_library(),
+            [
+                ("Django", "https://www.djangoproject.com/", "Django"),
+                ("Python", "https://www.python.org/", "Bookmarks bar"),
+            ],
+        )
+
+    def test_firefox_json(self):
+        file = BytesIO(json.dumps(FIREFOX_JSON).encode())
+        importer = BookmarkImporter(self.user).import_file(file)
+        self.assertEqual(
+            self.get_library(), [("Python", "https://www.python.org/", "menu")]
+        )
+        self.assertEqual(importer.skipped, 1)
+
+    def test_batches(self):
+        bookmarks = b"".join(
+            b'<DT><A HREF="https://example.com/%d/">%d</A>\n' % (i, i)
+            for i in range(25)
+        )
+        progress = []
+        BookmarkImporter(
+            self.user,
+            batch_size=10,
+            progress=lambda importer: progress.append(importer.created),
+        ).import_file(BytesIO(b"<DL><p>\n" + bookmarks + b"</DL><p>\n"))
+        self.assertEqual(progress, [10, 20, 25])
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 25)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(suffix=".html") as file:
+            file.write(NETSCAPE_HTML)
+            file.flush()
+            out = StringIO()
+            call_command(
+                "import_bookmarks", self.user.email, file.name, batch_size=1, stdout=out
+            )
+        self.assertIn(
+            "Imported 3 bookmarks into 2 new lists (1 skipped)", out.getvalue()
+        )
+        self.assertEqual(out.getvalue().count("Imported"), 4)
+
+    def test_endpoint(self):
+        list1 = List.objects.create(name="List1", user=self.user)
+        response = self.client.post(
+            "/api/bookmarks/import/",
+            {
+                "file": SimpleUploadedFile("bookmarks.html", NETSCAPE_HTML),
+                "list": list1.id,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            response.data, {"created": 3, "lists_created": 2, "skipped": 1}
+        )
+        self.assertTrue(
+            Bookmark.objects.filter(user=self.user, name="Example", list=list1).exists()
+        )
+
+    def test_endpoint_errors(self):
+        user2 = User.objects.create_user(email="test2@example.com", password="12345")
+        other_list = List.objects.create(name="List", user=user2)
+        response = self.client.post(
+            "/api/bookmarks/import/",
+            {
+                "file": SimpleUploadedFile("bookmarks.html", NETSCAPE_HTML),
+                "list": other_list.id,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            "/api/bookmarks/import/",
+            {"file": SimpleUploadedFile("bookmarks.json", b'{"children": [')},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post("/api/bookmarks/import/", {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Bookmark.objects.filter(user=self.user).exists())
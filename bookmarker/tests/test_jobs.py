@@ -0,0 +1,135 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookmarker.jobs import (
+    claim_job,
+    enqueue,
+    get_retry_delay,
+    job,
+    requeue_stale_jobs,
+    run_job,
+)
+from bookmarker.models import Job
+
+calls = []
+
+
+@job
+def record(value, suffix=""):
+    calls.append(f"{value}{suffix}")
+
+
+@job
+def fail():
+    raise ValueError("Failed")
+
+
+def not_a_job():
+    pass
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_all(self):
+        finished = []
+        while (claimed := claim_job()) is not None:
+            finished.append(run_job(claimed))
+        return finished
+
+    def test_run(self):
+        queued = enqueue(record, "a", suffix="!")
+        self.assertEqual(queued.name, "bookmarker.tests.test_jobs.record")
+
+        with CaptureQueriesContext(connection) as queries:
+            claimed = claim_job()
+        self.assertIn("FOR UPDATE SKIP LOCKED", queries.captured_queries[1]["sql"])
+        self.assertEqual(claimed.status, Job.RUNNING)
+        self.assertIsNone(claim_job())
+
+        finished = run_job(claimed)
+        self.assertEqual(calls, ["a!"])
+        finished.refresh_from_db()
+        self.assertEqual(finished.status, Job.SUCCEEDED)
+        self.assertEqual(finished.attempts, 1)
+        self.assertGreaterEqual(finished.wait_time, timedelta())
+        self.assertEqual(
+            finished.run_time, finished.datetime_finished - finished.datetime_started
+        )
+
+    def test_order(self):
+        enqueue(record, "low", priority=-1)
+        enqueue(record, "first")
+        enqueue(record, "high", priority=5)
+        enqueue(record, "second")
+        enqueue(record, "later", run_at=timezone.now() + timedelta(minutes=5))
+
+        self.run_all()
+        self.assertEqual(calls, ["high", "first", "second", "low"])
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 1)
+
+    def test_retry(self):
+        queued = enqueue(fail, max_attempts=2)
+
+        failed = run_job(claim_job())
+        self.assertEqual(failed.status, Job.QUEUED)
+        self.assertIn("ValueError: Failed", failed.last_error)
+        self.assertEqual(failed.run_at, failed.datetime_finished + get_retry_delay(1))
+        self.assertIsNone(claim_job())
+
+        Job.objects.filter(id=queued.id).update(run_at=timezone.now())
+        failed = run_job(claim_job())
+        self.assertEqual(failed.status, Job.FAILED)
+        self.assertEqual(failed.attempts, 2)
+        self.assertIsNone(claim_job())
+
+    def test_requeue_stale_jobs(self):
+        enqueue(record, "a")
+        claimed = claim_job()
+        self.assertEqual(requeue_stale_jobs(timedelta(minutes=1)), 0)
+        Job.objects.filter(id=claimed.id).update(
+            datetime_started=timezone.now() - timedelta(minutes=2)
+        )
+        self.assertEqual(requeue_stale_jobs(timedelta(minutes=1)), 1)
+        self.assertEqual(claim_job().id, claimed.id)
+
+        # The first attempt finishing late does not overwrite the second one.
+        run_job(claimed)
+        self.assertEqual(Job.objects.get(id=claimed.id).status, Job.RUNNING)
+
+    def test_stale_job_attempts(self):
+        queued = enqueue(record, "a", max_attempts=2)
+        for status in (Job.QUEUED, Job.FAILED):
+            claimed = claim_job()
+            Job.objects.filter(id=claimed.id).update(
+                datetime_started=timezone.now() - timedelta(minutes=2)
+            )
+            self.assertEqual(requeue_stale_jobs(timedelta(minutes=1)), 1)
+            self.assertEqual(Job.objects.get(id=queued.id).status, status)
+        self.assertIsNone(claim_job())
+
+    def test_not_a_job(self):
+        with self.assertRaises(ValueError):
+            enqueue(not_a_job)
+        Job.objects.create(name="bookmarker.tests.test_jobs.not_a_job")
+        failed = run_job(claim_job())
+        self.assertIn("LookupError", failed.last_error)
+
+    def test_command(self):
+        enqueue(record, "a")
+        enqueue(fail, max_attempts=1)
+        out = StringIO()
+        err = StringIO()
+        call_command("run_worker", once=True, stdout=out, stderr=err)
+        self.assertEqual(calls, ["a"])
+        self.assertIn("bookmarker.tests.test_jobs.record", out.getvalue())
+        self.assertIn("succeeded", out.getvalue())
+        self.assertIn("failed", err.getvalue())
+        self.assertIn("ValueError: Failed", err.getvalue())
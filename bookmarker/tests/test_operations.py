@@ -1,6 +1,10 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-from bookmarker.models import User, List, Bookmark
+from bookmarker.deletion import delete_account
+from bookmarker.models import AccountDeletion, User, List, Bookmark
 
 
 class DeletionTests(TestCase):
@@ -34,3 +38,99 @@ class DeletionTests(TestCase):
         list1.delete_related_bookmarks()
 
         self.assertFalse(Bookmark.objects.filter(pk=bookmark1.pk).exists())
+
+    def test_list_delete_queries(self):
+        # The number of queries does not depend on the number of bookmarks in the
+        # list.
+        user = User.objects.create_user("test@example.com", "12345")
+        for size in (1, 500):
+            list1 = List.objects.create(user=user, name="Test")
+            Bookmark.objects.bulk_create(
+                Bookmark(user=user, name="Test", list=list1) for _ in range(size)
+            )
+            # Savepoint, update, delete and release.
+            with self.assertNumQueries(4):
+                list1.delete()
+        self.assertFalse(List.objects.exists())
+        self.assertEqual(Bookmark.objects.filter(list=None).count(), 501)
+
+    def test_delete_with_bookmarks(self):
+        user = User.objects.create_user("test@example.com", "12345")
+        list1 = List.objects.create(user=user, name="Test")
+        list2 = List.objects.create(user=user, name="Test")
+        Bookmark.objects.bulk_create(
+            Bookmark(user=user, name="Test", list=list1) for _ in range(500)
+        )
+        bookmark2 = Bookmark.objects.create(user=user, name="Test", list=list2)
+
+        # Savepoint, delete of the bookmarks, delete of the list and release.
+        with self.assertNumQueries(4):
+            deleted = list1.delete_with_bookmarks()
+
+        self.assertEqual(
+            deleted, (501, {"bookmarker.Bookmark": 500, "bookmarker.List": 1})
+        )
+        self.assertEqual(list(List.objects.all()), [list2])
+        self.assertEqual(list(Bookmark.objects.all()), [bookmark2])
+
+
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("test@example.com", "12345")
+        self.user2 = User.objects.create_user("test2@example.com", "12345")
+        for user in (self.user, self.user2):
+            lists = List.objects.bulk_create(
+                List(user=user, name=f"List{i}") for i in range(5)
+            )
+            Bookmark.objects.bulk_create(
+                Bookmark(user=user, name="Test", list=lists[i % 5] if i % 3 else None)
+                for i in range(25)
+            )
+
+    def test_schedule_deletion(self):
+        deletion = self.user.schedule_deletion()
+
+        self.assertFalse(User.objects.get(id=self.user.id).is_active)
+        self.assertEqual(deletion, AccountDeletion.objects.get(user=self.user))
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 25)
+        self.assertEqual(self.user.schedule_deletion(), deletion)
+
+    def test_delete_account(self):
+        deletion = self.user.schedule_deletion()
+        batches = []
+        delete_account(
+            deletion,
+            batch_size=10,
+            progress=lambda d: batches.append((d.bookmarks_deleted, d.lists_deleted)),
+        )
+
+        self.assertEqual(batches, [(10, 0), (20, 0), (25, 0), (25, 5)])
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+        self.assertFalse(AccountDeletion.objects.exists())
+        self.assertEqual(Bookmark.objects.count(), 25)
+        self.assertEqual(List.objects.count(), 5)
+
+    def test_resume_delete_account(self):
+        deletion = self.user.schedule_deletion()
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupt(d):
+            if d.bookmarks_deleted == 20:
+                raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            delete_account(deletion, batch_size=10, progress=interrupt)
+        deletion = AccountDeletion.objects.get(user=self.user)
+        self.assertEqual(deletion.bookmarks_deleted, 20)
+        self.assertIsNotNone(deletion.datetime_updated)
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 5)
+
+        out = StringIO()
+        call_command("delete_accounts", batch_size=10, stdout=out)
+
+        self.assertIn("Deleted 25 bookmarks and 5 lists", out.getvalue())
+        self.assertIn("Deleted 1 accounts", out.getvalue())
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+        self.assertTrue(User.objects.filter(id=self.user2.id).exists())
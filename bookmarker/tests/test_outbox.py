@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bookmarker.models import OutgoingEmail
+from bookmarker.outbox import MAX_ATTEMPTS, queue_email, send_queued_emails
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        if any("fail" in message.to[0] for message in messages):
+            raise OSError("Recipient refused")
+        return super().send_messages(messages)
+
+
+class UnavailableBackend(EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError()
+
+
+class OutboxTests(TestCase):
+    def queue(self, to="test@example.com"):
+        return queue_email("Subject", "Body", "noreply@example.com", to)
+
+    @override_settings(EMAIL_BACKEND="bookmarker.tests.test_outbox.CountingBackend")
+    def test_send(self):
+        CountingBackend.opened = 0
+        for i in range(5):
+            self.queue(f"test{i}@example.com")
+
+        self.assertEqual(send_queued_emails(batch_size=3), (3, 0))
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(send_queued_emails(batch_size=3), (2, 0))
+        self.assertEqual(send_queued_emails(batch_size=3), (0, 0))
+
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [[f"test{i}@example.com"] for i in range(5)],
+        )
+        self.assertFalse(OutgoingEmail.objects.filter(datetime_sent=None).exists())
+
+    def test_not_committed(self):
+        class Rollback(Exception):
+            pass
+
+        with self.assertRaises(Rollback):
+            with transaction.atomic():
+                self.queue()
+                raise Rollback()
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND="bookmarker.tests.test_outbox.FailingBackend")
+    def test_retry(self):
+        email = self.queue("fail@example.com")
+        self.queue()
+
+        self.assertEqual(send_queued_emails(), (1, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "Recipient refused")
+        self.assertIsNone(email.datetime_sent)
+        self.assertGreater(email.datetime_next_attempt, timezone.now())
+        # Not retried until the next attempt is due.
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+        delays = []
+        for _ in range(MAX_ATTEMPTS - 1):
+            OutgoingEmail.objects.filter(id=email.id).update(
+                datetime_next_attempt=timezone.now()
+            )
+            start = timezone.now()
+            self.assertEqual(send_queued_emails(), (0, 1))
+            email.refresh_from_db()
+            delays.append(email.datetime_next_attempt - start)
+        self.assertEqual(email.attempts, MAX_ATTEMPTS)
+        self.assertEqual(
+            [delay // timedelta(minutes=1) for delay in delays[:4]], [2, 4, 8, 16]
+        )
+        self.assertEqual(delays[-1] // timedelta(hours=1), 6)
+
+        OutgoingEmail.objects.filter(id=email.id).update(
+            datetime_next_attempt=timezone.now()
+        )
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND="bookmarker.tests.test_outbox.UnavailableBackend")
+    def test_unavailable(self):
+        self.queue()
+        self.queue()
+        self.assertEqual(send_queued_emails(), (0, 2))
+        self.assertEqual(
+            list(OutgoingEmail.objects.values_list("last_error", flat=True)),
+            ["ConnectionRefusedError"] * 2,
+        )
+
+    def test_command(self):
+        for i in range(5):
+            self.queue(f"test{i}@example.com")
+        out = StringIO()
+        call_command("send_emails", once=True, batch_size=2, stdout=out)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertIn("Sent 2 emails (0 failed)", out.getvalue())
@@ -0,0 +1,102 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from bookmarker.models import Bookmark, List, User
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test1@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+
+    def collect_pages(self, url):
+        names = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names.extend(bookmark["name"] for bookmark in response.data["results"])
+            url = response.data["next"]
+            pages += 1
+        return names, pages
+
+    def test_unpaginated_by_default(self):
+        Bookmark.objects.create(
+            name="Bookmark1", url="http://example.com", user=self.user
+        )
+
+        response = self.client.get("/api/bookmarks/")
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 1)
+
+    def test_pages_follow_ordering_with_ties(self):
+        for i in range(7):
+            Bookmark.objects.create(
+                name=f"Bookmark{i % 3}", url=f"http://example.com/{i}/", user=self.user
+            )
+        expected = list(
+            Bookmark.objects.filter(user=self.user)
+            .order_by("name", "id")
+            .values_list("name", flat=True)
+        )
+
+        names, pages = self.collect_pages("/api/bookmarks/?page_size=2")
+        self.assertEqual(names, expected)
+        self.assertEqual(pages, 4)
+
+        names, pages = self.collect_pages("/api/bookmarks/?page_size=3&ordering=-name")
+        self.assertEqual(names, list(reversed(expected)))
+        self.assertEqual(pages, 3)
+
+    def test_previous_page(self):
+        for i in range(5):
+            Bookmark.objects.create(
+                name=f"Bookmark{i}", url="http://example.com", user=self.user
+            )
+
+        first = self.client.get("/api/bookmarks/?page_size=2")
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        third = self.client.get(second.data["next"])
+        self.assertEqual([b["name"] for b in third.data["results"]], ["Bookmark4"])
+        self.assertIsNone(third.data["next"])
+
+        previous = self.client.get(third.data["previous"])
+        self.assertEqual(previous.data["results"], second.data["results"])
+        self.assertIsNotNone(previous.data["next"])
+
+    def test_pages_with_filters_and_search(self):
+        list1 = List.objects.create(name="List1", user=self.user)
+        for i in range(5):
+            Bookmark.objects.create(
+                name=f"Bookmark{i}",
+                url="http://example.com",
+                user=self.user,
+                list=list1 if i % 2 else None,
+                unread=i < 3,
+            )
+
+        names, _ = self.collect_pages(f"/api/bookmarks/?page_size=1&list={list1.id}")
+        self.assertEqual(names, ["Bookmark1", "Bookmark3"])
+
+        names, _ = self.collect_pages("/api/bookmarks/?page_size=2&unread=true")
+        self.assertEqual(names, ["Bookmark0", "Bookmark1", "Bookmark2"])
+
+        names, _ = self.collect_pages("/api/bookmarks/?page_size=1&search=Bookmark4")
+        self.assertEqual(names, ["Bookmark4"])
+
+    def test_lists_paginated(self):
+        for i in range(3):
+            List.objects.create(name=f"List{i}", user=self.user)
+
+        response = self.client.get("/api/lists/?page_size=2")
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual([l["name"] for l in response.data["results"]], ["List2"])
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/bookmarks/?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,220 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+from rest_framework.test import APITestCase
+
+from bookmarker import urls
+from bookmarker.models import Bookmark, EmailConfirmationToken, List, User
+
+
+def get_pattern_names(patterns, prefix=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLPattern):
+            yield pattern.name or prefix + str(pattern.pattern)
+        else:
+            yield from get_pattern_names(
+                pattern.url_patterns, prefix + str(pattern.pattern)
+            )
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class QueryBudgetTests(APITestCase):
+    """
+    States the most queries that each endpoint may run for a typical request. Every URL
+    pattern in bookmarker/urls.py has to have a budget.
+
+    The session and the user of logged in requests are read from the "auth" cache, so
+    they are not counted, except for the user after it is saved.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        self.list = List.objects.create(user=self.user, name="List1")
+        self.list2 = List.objects.create(user=self.user, name="List2")
+        self.bookmarks = Bookmark.objects.bulk_create(
+            Bookmark(
+                user=self.user,
+                name=f"Bookmark{i}",
+                url="http://example.com",
+                list=self.list if i % 2 else None,
+            )
+            for i in range(10)
+        )
+        self.client.force_login(self.user)
+
+    def get_budgets(self):
+        bookmark = self.bookmarks[0]
+        token = EmailConfirmationToken.objects.create(user=self.user, token="token")
+        html = (
+            b'<DL><p><DT><H3>Folder</H3><DL><p><DT><A HREF="http://example.com">'
+            b"Example</A></DL><p></DL><p>"
+        )
+        new_bookmark = {"name": "New", "url": "http://example.com"}
+        # Pattern name (or route), method, URL, arguments of the request, budget.
+        return [
+            ("api-root", "get", "/api/", {}, 0),
+            ("bookmark-list", "get", "/api/bookmarks/", {}, 2),
+            (
+                "bookmark-list",
+                "get",
+                f"/api/bookmarks/?list={self.list.id}&unread=true&page_size=5",
+                {},
+                3,
+            ),
+            ("bookmark-list", "get", "/api/bookmarks/?search=bookmark", {}, 2),
+            (
+                "bookmark-list",
+                "post",
+                "/api/bookmarks/",
+                {"data": {**new_bookmark, "list": self.list.id}, "format": "json"},
+                2,
+            ),
+            ("bookmark-detail", "get", f"/api/bookmarks/{bookmark.id}/", {}, 2),
+            (
+                "bookmark-detail",
+                "patch",
+                f"/api/bookmarks/{bookmark.id}/",
+                {"data": {"name": "Changed", "list": self.list2.id}, "format": "json"},
+                3,
+            ),
+            (
+                "bookmark-detail",
+                "put",
+                f"/api/bookmarks/{bookmark.id}/",
+                {"data": {**new_bookmark, "list": None}, "format": "json"},
+                2,
+            ),
+            ("bookmark-detail", "delete", f"/api/bookmarks/{bookmark.id}/", {}, 2),
+            (
+                "bookmark-batch",
+                "post",
+                "/api/bookmarks/batch/",
+                {
+                    "data": [
+                        {
+                            "op": "create",
+                            "data": {**new_bookmark, "list": self.list.id},
+                        },
+                        {
+                            "op": "update",
+                            "id": self.bookmarks[1].id,
+                            "data": {"list": self.list2.id},
+                        },
+                        {"op": "delete", "id": self.bookmarks[2].id},
+                    ],
+                    "format": "json",
+                },
+                7,
+            ),
+            (
+                "bookmark-import-bookmarks",
+                "post",
+                "/api/bookmarks/import/",
+                {"data": {"file": SimpleUploadedFile("bookmarks.html", html)}},
+                4,
+            ),
+            ("bookmark-suggest", "get", "/api/bookmarks/suggest/?q=book", {}, 2),
+            (
+                "bookmark-lookup",
+                "get",
+                "/api/bookmarks/lookup/?url=https://example.com/",
+                {},
+                1,
+            ),
+            (
+                "bookmark-list",
+                "post",
+                "/api/bookmarks/?on_duplicate=update",
+                {"data": {"name": "Changed", "url": "https://example.com/"}},
+                5,
+            ),
+            ("bookmark-export", "get", "/api/bookmarks/export/?format=html", {}, 2),
+            ("list-list", "get", "/api/lists/", {}, 2),
+            ("list-counts", "get", "/api/lists/counts/", {}, 3),
+            ("list-list", "post", "/api/lists/", {"data": {"name": "New"}}, 1),
+            ("list-detail", "get", f"/api/lists/{self.list.id}/", {}, 2),
+            (
+                "list-detail",
+                "patch",
+                f"/api/lists/{self.list.id}/",
+                {"data": {"name": "Changed"}},
+                2,
+            ),
+            ("list-detail", "delete", f"/api/lists/{self.list2.id}/", {}, 5),
+            (
+                "list-delete-list-and-bookmarks",
+                "delete",
+                f"/api/lists/{self.list.id}/include-related/",
+                {},
+                5,
+            ),
+            ("api/user/", "get", "/api/user/", {}, 0),
+            ("api/confirmed-status/", "get", "/api/confirmed-status/", {}, 0),
+            ("api/sync/", "get", "/api/sync/", {}, 6),
+            # Served by EventStream under ASGI.
+            ("api/events/", "get", "/api/events/", {}, 0),
+            ("api/set-cookie/", "get", "/api/set-cookie/", {}, 0),
+            ("api/resend-confirmation/", "post", "/api/resend-confirmation/", {}, 4),
+            ("confirm-user", "get", f"/confirm/{self.user.id}/{token.token}/", {}, 2),
+            # Confirming saved the user, so it is loaded again.
+            (
+                "quick-save",
+                "get",
+                "/https://example.com/saved/",
+                {"HTTP_SEC_FETCH_SITE": "none"},
+                3,
+            ),
+            (
+                "go",
+                "get",
+                f"/go/{self.bookmarks[4].id}/",
+                {"HTTP_SEC_FETCH_SITE": "same-origin"},
+                1,
+            ),
+            # The data that the app would request is embedded in the page.
+            ("index", "get", "/", {}, 5),
+            ("for_app", "get", "/app/", {}, 6),
+            ("api/logout/", "post", "/api/logout/", {}, 2),
+            (
+                "api/login/",
+                "post",
+                "/api/login/",
+                {"data": {"email": "test@example.com", "password": "12345"}},
+                9,
+            ),
+            (
+                "api/register/",
+                "post",
+                "/api/register/",
+                {"data": {"email": "test2@example.com", "password": "12345"}},
+                17,
+            ),
+            # Deactivates the user that registered, so it has to be last.
+            ("api/user/", "delete", "/api/user/", {}, 13),
+        ]
+
+    def test_budgets_cover_urls(self):
+        names = {budget[0] for budget in self.get_budgets()}
+        self.assertEqual(set(get_pattern_names(urls.urlpatterns)) - names, set())
+
+    def test_budgets(self):
+        # Caches the user, like any earlier request.
+        self.client.get("/api/user/")
+        for _, method, url, kwargs, budget in self.get_budgets():
+            with self.subTest(method=method, url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(self.client, method)(url, **kwargs)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                self.assertLess(response.status_code, 400)
+                self.assertLessEqual(
+                    len(queries),
+                    budget,
+                    "\n".join(query["sql"] for query in queries.captured_queries),
+                )
@@ -0,0 +1,146 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from bookmarker.models import Bookmark, List, User
+
+
+class QueryPlanTests(APITestCase):
+    """
+    Seeds one large account among many small ones and checks that each page of the
+    list endpoints is read by walking an index in order, with no sort step.
+
+    Only paginated requests are checked. When all of a large account's bookmarks are
+    requested at once, scanning and sorting them is the cheaper plan.
+    """
+
+    other_users = 500
+    lists_per_user = 10
+    bookmarks_per_other_user = 20
+    bookmarks = 30000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        others = User.objects.bulk_create(
+            User(email=f"test{i}@example.com") for i in range(cls.other_users)
+        )
+        List.objects.bulk_create(
+            List(user=user, name=f"List{i}")
+            for user in [cls.user, *others]
+            for i in range(cls.lists_per_user)
+        )
+        lists = {}
+        for list_ in List.objects.order_by("id"):
+            lists.setdefault(list_.user_id, []).append(list_)
+        cls.list = lists[cls.user.id][0]
+
+        def bookmark(user, i):
+            return Bookmark(
+                user=user,
+                name=f"Bookmark{i % 700}",
+                url=f"http://example.com/{i}/",
+                unread=i % 4 == 0,
+                list=lists[user.id][i % cls.lists_per_user] if i % 3 else None,
+            )
+
+        # Bookmarks of different users are interleaved like they would be after being
+        # saved over time, so that no index matches the physical order of the rows.
+        def rows():
+            step = cls.bookmarks // (len(others) * cls.bookmarks_per_other_user)
+            for i in range(cls.bookmarks):
+                yield bookmark(cls.user, i)
+                if i % step == 0:
+                    yield bookmark(others[i // step % len(others)], i)
+
+        Bookmark.objects.bulk_create(rows(), batch_size=2000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE bookmarker_bookmark")
+            cursor.execute("ANALYZE bookmarker_list")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_plan(self, url, table):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        sql = next(
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def get_nodes(self, plan):
+        yield plan
+        for child in plan.get("Plans", []):
+            yield from self.get_nodes(child)
+
+    def assertOrderedIndexScan(self, url, table="bookmarker_bookmark"):
+        nodes = list(self.get_nodes(self.get_plan(url, table)))
+        node_types = [node["Node Type"] for node in nodes]
+        self.assertFalse(
+            {"Sort", "Incremental Sort"} & set(node_types), f"{url}: {node_types}"
+        )
+        scans = [
+            node
+            for node in nodes
+            if node["Node Type"] in ("Index Scan", "Index Only Scan")
+        ]
+        self.assertTrue(scans, f"{url}: {node_types}")
+        return scans[0]
+
+    def test_bookmark_pages(self):
+        filters = [
+            "",
+            "&unread=true",
+            "&unread=false",
+            f"&list={self.list.id}",
+            f"&list={self.list.id}&unread=true",
+        ]
+        for query in filters:
+            for ordering in ("", "&ordering=name", "&ordering=-name"):
+                with self.subTest(query=query, ordering=ordering):
+                    url = f"/api/bookmarks/?page_size=50{query}{ordering}"
+                    self.assertOrderedIndexScan(url)
+
+                    # Later pages have to start the scan at the cursor rather than
+                    # filtering out the rows of every page before it.
+                    response = self.client.get(url)
+                    for _ in range(3):
+                        response = self.client.get(response.data["next"])
+                    scan = self.assertOrderedIndexScan(response.data["next"])
+                    self.assertIn("name", scan["Index Cond"])
+
+    def test_list_pages(self):
+        for query in ("", "&ordering=-name"):
+            with self.subTest(query=query):
+                self.assertOrderedIndexScan(
+                    f"/api/lists/?page_size=5{query}", "bookmarker_list"
+                )
+
+    def test_frecency_pages(self):
+        url = "/api/bookmarks/?page_size=50&ordering=-frecency"
+        self.assertOrderedIndexScan(url)
+        response = self.client.get(url)
+        scan = self.assertOrderedIndexScan(response.data["next"])
+        self.assertIn("frecency", scan["Index Cond"])
+
+    def test_sync_pages(self):
+        url = "/api/sync/?limit=50"
+        self.assertOrderedIndexScan(url)
+        response = self.client.get(url)
+        for _ in range(3):
+            response = self.client.get(url + "&since=" + response.data["token"])
+        scan = self.assertOrderedIndexScan(url + "&since=" + response.data["token"])
+        self.assertIn("datetime_modified", scan["Index Cond"])
@@ -0,0 +1,94 @@
+from django.test import TestCase, override_settings
+
+from bookmarker.models import Bookmark, List, User
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class QuickSaveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+
+    def save(self, path, site="none"):
+        headers = {"HTTP_SEC_FETCH_SITE": site} if site else {}
+        return self.client.get(path, **headers)
+
+    def test_save(self):
+        # User, lookup of the URL and insert. The session is cached when logging in.
+        with self.assertNumQueries(3):
+            response = self.save("/https://example.com/page/")
+        self.assertEqual(response.status_code, 201)
+        bookmark = Bookmark.objects.get()
+        self.assertEqual(bookmark.user, self.user)
+        self.assertEqual(bookmark.url, "https://example.com/page/")
+        self.assertEqual(bookmark.name, "example.com/page")
+        self.assertIsNone(bookmark.list)
+        self.assertContains(response, f"/app/edit/{bookmark.id}/", status_code=201)
+        self.assertNotContains(response, "main.js", status_code=201)
+
+    def test_save_url(self):
+        for path, url in (
+            ("/http://example.com", "http://example.com"),
+            ("/https:/example.com/a?b=1&c=2", "https://example.com/a?b=1&c=2"),
+            ("/https://example.com/a%20b", "https://example.com/a%20b"),
+        ):
+            with self.subTest(path=path):
+                response = self.save(path, site="same-origin")
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(Bookmark.objects.latest("id").url, url)
+
+    def test_save_to_list(self):
+        list1 = List.objects.create(user=self.user, name="List1")
+        response = self.save(f"/{list1.id}/https://example.com/")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Bookmark.objects.get().list, list1)
+
+        user2 = User.objects.create_user(email="test2@example.com", password="12345")
+        list2 = List.objects.create(user=user2, name="List2")
+        response = self.save(f"/{list2.id}/https://example.com/other/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Bookmark.objects.count(), 1)
+
+    def test_already_saved(self):
+        bookmark = Bookmark.objects.create(
+            user=self.user, name="Page", url="http://example.com/page"
+        )
+        response = self.save("/https://EXAMPLE.com/page/?utm_source=feed")
+        self.assertContains(response, "Already saved")
+        self.assertContains(response, f"/app/edit/{bookmark.id}/")
+        self.assertEqual(Bookmark.objects.count(), 1)
+
+    def test_invalid_url(self):
+        for path in ("/https://", "/http://[abc/"):
+            with self.subTest(path=path):
+                response = self.save(path)
+                self.assertEqual(response.status_code, 400)
+                self.assertContains(response, "Enter a valid URL.", status_code=400)
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_app_fallback(self):
+        # Requests from other sites, or from browsers that do not say where they come
+        # from, get the app's form for saving the bookmark.
+        for site in ("cross-site", "same-site", None):
+            with self.subTest(site=site):
+                response = self.save("/https://example.com/", site=site)
+                self.assertContains(response, "main.js")
+        self.client.logout()
+        response = self.save("/https://example.com/")
+        self.assertContains(response, "main.js")
+        response = self.save("/5/https://example.com/?a=1")
+        self.assertRedirects(
+            response, "/https://example.com/?a=1", fetch_redirect_response=False
+        )
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_unconfirmed(self):
+        self.user.is_confirmed = False
+        self.user.save()
+        response = self.save("/https://example.com/")
+        self.assertContains(response, "main.js")
+        self.assertFalse(Bookmark.objects.exists())
@@ -0,0 +1,107 @@
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from bookmarker.models import Bookmark, List, User
+from bookmarker.views import BookmarkViewSet
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        caches["responses"].clear()
+        self.user = User.objects.create_user(
+            email="test1@example.com", password="12345", is_confirmed=True
+        )
+        self.list = List.objects.create(user=self.user, name="List1")
+        Bookmark.objects.create(
+            user=self.user, name="Bookmark1", url="http://example.com", list=self.list
+        )
+        self.client.force_login(self.user)
+
+    def assertCached(self, url, cached=True):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tables = {"bookmarker_bookmark", "bookmarker_list"}
+        queried = any(
+            f'FROM "{table}"' in query["sql"]
+            for query in queries.captured_queries
+            for table in tables
+        )
+        self.assertEqual(queried, not cached, url)
+        return response
+
+    def test_cached(self):
+        for url in (
+            "/api/bookmarks/",
+            f"/api/bookmarks/?list={self.list.id}&unread=true",
+            "/api/bookmarks/?search=bookmark&page_size=10",
+            "/api/lists/",
+        ):
+            with self.subTest(url=url):
+                response = self.assertCached(url, cached=False)
+                self.assertEqual(self.assertCached(url).data, response.data)
+
+    def test_normalized_params(self):
+        self.assertCached(f"/api/bookmarks/?unread=true&list={self.list.id}", False)
+        self.assertCached(f"/api/bookmarks/?list={self.list.id}&unread=true")
+        self.assertCached(f"/api/bookmarks/?list={self.list.id}&unread=false", False)
+
+    def test_invalidated(self):
+        self.assertCached("/api/bookmarks/", cached=False)
+        self.client.post(
+            "/api/bookmarks/",
+            {"name": "Bookmark2", "url": "http://example.com"},
+            format="json",
+        )
+        response = self.assertCached("/api/bookmarks/", cached=False)
+        self.assertEqual(len(response.data), 2)
+
+        self.assertCached("/api/lists/", cached=False)
+        List.objects.filter(id=self.list.id).update(name="List2")
+        response = self.assertCached("/api/lists/", cached=False)
+        self.assertEqual(response.data[0]["name"], "List2")
+
+    def test_other_users(self):
+        self.assertCached("/api/lists/", cached=False)
+        user2 = User.objects.create_user(
+            email="test2@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(user2)
+        response = self.assertCached("/api/lists/", cached=False)
+        self.assertEqual(response.data, [])
+
+    @mock.patch.object(BookmarkViewSet, "response_cache_max_results", 5)
+    def test_max_results(self):
+        Bookmark.objects.bulk_create(
+            Bookmark(user=self.user, name="Bookmark", url="http://example.com")
+            for _ in range(5)
+        )
+        self.assertCached("/api/bookmarks/?page_size=5", cached=False)
+        self.assertCached("/api/bookmarks/?page_size=5")
+        self.assertCached("/api/bookmarks/", cached=False)
+        self.assertCached("/api/bookmarks/", cached=False)
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                CACHES={
+                    "default": {
+                        "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+                    },
+                    "responses": {
+                        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                        "LOCATION": directory,
+                    },
+                    "auth": settings.CACHES["auth"],
+                }
+            ):
+                self.assertCached("/api/lists/", cached=False)
+                self.assertCached("/api/lists/")
@@ -0,0 +1,146 @@
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from bookmarker.filters import FullTextSearchFilter
+from bookmarker.models import Bookmark, User
+from bookmarker.views import BookmarkViewSet
+
+
+class FullTextSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test1@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+
+    def search(self, query, **params):
+        response = self.client.get("/api/bookmarks/", {"search": query, **params})
+        return [bookmark["name"] for bookmark in response.data]
+
+    def test_url_split_into_host_and_path(self):
+        Bookmark.objects.create(
+            name="Repository",
+            url="https://github.com/onstop4/Bookmarker",
+            user=self.user,
+        )
+        Bookmark.objects.create(
+            name="Docs", url="https://docs.djangoproject.com/en/3.2/", user=self.user
+        )
+
+        self.assertEqual(self.search("github"), ["Repository"])
+        self.assertEqual(self.search("github.com/onst"), ["Repository"])
+        self.assertEqual(self.search("bookmarker"), ["Repository"])
+        self.assertEqual(self.search("djangoproject en"), ["Docs"])
+        self.assertEqual(self.search("com"), ["Docs", "Repository"])
+        self.assertEqual(self.search("gitlab"), [])
+
+    def test_vector_follows_updates(self):
+        bookmark = Bookmark.objects.create(
+            name="Old name", url="http://example.com", user=self.user
+        )
+        bookmark.name = "New name"
+        bookmark.save()
+        self.assertEqual(self.search("new"), ["New name"])
+
+        Bookmark.objects.filter(id=bookmark.id).update(url="http://another.org")
+        self.assertEqual(self.search("another"), ["New name"])
+        self.assertEqual(self.search("example"), [])
+
+    def test_ranked_results(self):
+        Bookmark.objects.create(
+            name="A page", url="http://example.com/python/", user=self.user
+        )
+        Bookmark.objects.create(name="B page", url="http://python.org/", user=self.user)
+        Bookmark.objects.create(
+            name="Python docs", url="http://example.com/", user=self.user
+        )
+
+        # Name matches rank above host matches, which rank above path matches.
+        self.assertEqual(self.search("python"), ["Python docs", "B page", "A page"])
+        self.assertEqual(
+            self.search("python", ordering="name"),
+            ["A page", "B page", "Python docs"],
+        )
+
+    def test_ranked_results_paginated(self):
+        for i in range(4):
+            Bookmark.objects.create(
+                name=f"Python {i}", url="http://example.com/", user=self.user
+            )
+            Bookmark.objects.create(
+                name=f"Page {i}", url="http://python.org/", user=self.user
+            )
+
+        names = []
+        response = self.client.get("/api/bookmarks/?search=python&page_size=3")
+        while True:
+            names.extend(bookmark["name"] for bookmark in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(
+            names, [f"Python {i}" for i in range(4)] + [f"Page {i}" for i in range(4)]
+        )
+
+
+class FuzzySearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test1@example.com", password="12345", is_confirmed=True
+        )
+        self.client.force_login(self.user)
+        Bookmark.objects.create(
+            name="Repository",
+            url="https://github.com/onstop4/Bookmarker",
+            user=self.user,
+        )
+        Bookmark.objects.create(
+            name="Django documentation",
+            url="https://docs.djangoproject.com/en/3.2/",
+            user=self.user,
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(
+            "/api/bookmarks/", {"search": query, "search_mode": "fuzzy", **params}
+        )
+        return [bookmark["name"] for bookmark in response.data]
+
+    def test_substring(self):
+        self.assertEqual(self.search("github.com/onst"), ["Repository"])
+        self.assertEqual(self.search("REPOSIT"), ["Repository"])
+        self.assertEqual(self.search("100%"), [])
+
+    def test_typos(self):
+        self.assertEqual(self.search("documantation"), ["Django documentation"])
+        self.assertEqual(self.search("djangoprojetc"), ["Django documentation"])
+
+    def test_ranked_by_similarity(self):
+        Bookmark.objects.create(
+            name="Documents", url="http://example.com/", user=self.user
+        )
+        self.assertEqual(
+            self.search("documents"), ["Documents", "Django documentation"]
+        )
+        self.assertEqual(
+            self.search("documents", ordering="-name"),
+            ["Documents", "Django documentation"],
+        )
+        self.assertEqual(
+            self.search("documents", ordering="name"),
+            ["Django documentation", "Documents"],
+        )
+
+    def test_uses_trigram_indexes(self):
+        queryset = FullTextSearchFilter().filter_fuzzy(
+            Request(APIRequestFactory().get("/", {"search": "onst"})),
+            Bookmark.objects.all(),
+            BookmarkViewSet(),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        self.assertIn("bookmark_name_trgm_idx", plan)
+        self.assertIn("bookmark_url_trgm_idx", plan)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from bookmarker import suggestions
+from bookmarker.frecency import get_frecency
+from bookmarker.models import Bookmark
+from bookmarker.suggestions import SuggestionCache, SuggestionIndex, search_queryset
+from bookmarker.tests.base import TwoUsersTestCase
+
+
+class SuggestionCacheTests(SimpleTestCase):
+    def test_lru(self):
+        # Two keys each: the name and the host.
+        index1, index2, index3 = (
+            SuggestionIndex([(i, f"Name{i}", f"https://example{i}.com/", None)])
+            for i in (1, 2, 3)
+        )
+        cache = SuggestionCache(5)
+        cache.set(1, 1, index1)
+        cache.set(2, 1, index2)
+        self.assertEqual(cache.get(1), (1, index1))
+        cache.set(3, 1, index3)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1), (1, index1))
+        self.assertEqual(cache.get(3), (1, index3))
+        self.assertEqual(cache.size, 4)
+
+    def test_size(self):
+        index = SuggestionIndex([(1, "Name", "https://example.com/", None)])
+        cache = SuggestionCache(3)
+        cache.set(1, 1, None)
+        cache.set(2, 1, None)
+        cache.set(3, 1, None)
+        self.assertEqual(cache.size, 3)
+        # Replacing an entry counts only its new size.
+        cache.set(3, 2, index)
+        self.assertEqual(cache.size, 3)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get(2), (1, None))
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+
+
+class SuggestTests(TwoUsersTestCase):
+    def setUp(self):
+        super().setUp()
+        suggestions.cache.clear()
+        now = timezone.now()
+        self.python, self.docs, self.news, self.old = Bookmark.objects.bulk_create(
+            [
+                Bookmark(
+                    user=self.user,
+                    name="Python tutorial",
+                    url="https://docs.python.org/3/tutorial/",
+                ),
+                Bookmark(
+                    user=self.user,
+                    name="Django documentation",
+                    url="https://www.djangoproject.com/docs/",
+                    frecency=get_frecency([now] * 5),
+                ),
+                Bookmark(
+                    user=self.user,
+                    name="Hacker News",
+                    url="https://news.ycombinator.com/",
+                ),
+                Bookmark(
+                    user=self.user,
+                    name="Old python docs",
+                    url="https://example.com/100%_python",
+                    frecency=get_frecency([now - timedelta(days=365)]),
+                ),
+            ]
+        )
+        Bookmark.objects.create(
+            user=self.user2, name="Python", url="https://python.org/"
+        )
+
+    def suggest(self, q, **params):
+        response = self.client.get("/api/bookmarks/suggest/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [bookmark["id"] for bookmark in response.data]
+
+    def test_matches(self):
+        queries = {
+            "pyth": [self.python, self.old],
+            "PYTHON T": [self.python],
+            "doc": [self.docs, self.python, self.old],
+            "djangoproject": [self.docs],
+            "www.djangoproject": [self.docs],
+            "news.y": [self.news],
+            "ycombinator": [],
+            "100%": [],
+            "python_": [],
+            "tutorial/": [],
+            "": [],
+        }
+        index = SuggestionIndex.build(Bookmark.objects.filter(user=self.user))
+        queryset = Bookmark.objects.filter(user=self.user)
+        for q, expected in queries.items():
+            expected = [bookmark.id for bookmark in expected]
+            with self.subTest(q=q):
+                self.assertEqual(self.suggest(q), expected)
+                if q:
+                    self.assertEqual(
+                        [item["id"] for item in index.search(q, 10)], expected
+                    )
+                    self.assertEqual(
+                        [item["id"] for item in search_queryset(queryset, q, 10)],
+                        expected,
+                    )
+
+    def test_limit(self):
+        self.assertEqual(self.suggest("doc", limit=1), [self.docs.id])
+        self.assertEqual(len(self.suggest("doc", limit="x")), 3)
+
+    def test_cache(self):
+        # The first search after a change is answered with a query.
+        with self.assertNumQueries(3):
+            self.assertEqual(self.suggest("hack"), [self.news.id])
+        # The next one builds the index.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.suggest("hacker"), [self.news.id])
+        # Later ones only check the user's data version.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.suggest("hacker n"), [self.news.id])
+
+        bookmark = Bookmark.objects.create(
+            user=self.user, name="Hacking", url="https://example.com/"
+        )
+        self.assertEqual(self.suggest("hack"), [bookmark.id, self.news.id])
+        self.assertEqual(self.suggest("hack"), [bookmark.id, self.news.id])
+        Bookmark.objects.filter(id=bookmark.id).delete()
+        self.assertEqual(self.suggest("hack"), [self.news.id])
+
+    def test_large_library(self):
+        with mock.patch("bookmarker.suggestions.MAX_INDEXED_BOOKMARKS", 2):
+            for _ in range(3):
+                self.assertEqual(self.suggest("hack"), [self.news.id])
+        self.assertIs(suggestions.cache.get(self.user.id)[1], suggestions.TOO_LARGE)
+
+    def test_index_larger_than_cache(self):
+        with mock.patch.object(suggestions.cache, "max_keys", 2):
+            for _ in range(3):
+                self.assertEqual(self.suggest("hack"), [self.news.id])
+            self.assertIs(suggestions.cache.get(self.user.id)[1], suggestions.TOO_LARGE)
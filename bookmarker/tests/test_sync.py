@@ -0,0 +1,186 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from bookmarker import sync
+from bookmarker.models import Bookmark, BookmarkVisit, List, Tombstone
+from bookmarker.visits import flush_visits
+from bookmarker.tests.base import TwoUsersTestCase
+
+
+class SyncTests(TwoUsersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.list1 = List.objects.create(user=self.user, name="List1")
+        self.list2 = List.objects.create(user=self.user, name="List2")
+        self.bookmarks = Bookmark.objects.bulk_create(
+            Bookmark(
+                user=self.user,
+                name=f"Bookmark{i}",
+                url="https://example.com",
+                list=[self.list1, self.list2, None][i % 3],
+            )
+            for i in range(6)
+        )
+        Bookmark.objects.create(user=self.user2, name="Other", url="https://a.com")
+
+    def sync(self, token=None, **params):
+        if token is not None:
+            params["since"] = token
+        response = self.client.get("/api/sync/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get_changes(self, token):
+        data = self.sync(token)
+        self.assertFalse(data["more"])
+        changes = (
+            {item["id"] for item in data["lists"]},
+            {item["id"] for item in data["bookmarks"]},
+            set(data["deleted"]["lists"]),
+            set(data["deleted"]["bookmarks"]),
+        )
+        return changes, data["token"]
+
+    def test_initial_sync(self):
+        data = self.sync()
+        self.assertEqual([item["name"] for item in data["lists"]], ["List1", "List2"])
+        self.assertEqual(
+            data["bookmarks"],
+            [
+                {
+                    "id": bookmark.id,
+                    "name": bookmark.name,
+                    "url": bookmark.url,
+                    "unread": True,
+                    "list": bookmark.list_id,
+                }
+                for bookmark in self.bookmarks
+            ],
+        )
+        self.assertEqual(data["deleted"], {"lists": [], "bookmarks": []})
+        self.assertFalse(data["more"])
+        self.assertIn("no-store", self.client.get("/api/sync/")["Cache-Control"])
+
+        changes, token = self.get_changes(data["token"])
+        self.assertEqual(changes, (set(), set(), set(), set()))
+        self.assertEqual(
+            self.get_changes(token)[1].split(".")[:3], token.split(".")[:3]
+        )
+
+    def test_changes(self):
+        token = self.sync()["token"]
+        bookmark = self.bookmarks[0]
+
+        response = self.client.patch(
+            f"/api/bookmarks/{bookmark.id}/", {"name": "Renamed"}
+        )
+        self.assertEqual(response.status_code, 200)
+        changes, token = self.get_changes(token)
+        self.assertEqual(changes, (set(), {bookmark.id}, set(), set()))
+
+        # Counting visits does not change anything that clients see.
+        BookmarkVisit.objects.create(bookmark_id=bookmark.id)
+        flush_visits()
+        List.objects.filter(id=self.list1.id).update(bookmark_count=100)
+        changes, token = self.get_changes(token)
+        self.assertEqual(changes, (set(), set(), set(), set()))
+
+        Bookmark.objects.filter(list=self.list2).update(unread=False)
+        changes, token = self.get_changes(token)
+        self.assertEqual(
+            changes, (set(), {self.bookmarks[1].id, self.bookmarks[4].id}, set(), set())
+        )
+
+        self.client.delete(f"/api/bookmarks/{bookmark.id}/")
+        changes, token = self.get_changes(token)
+        self.assertEqual(changes, (set(), set(), set(), {bookmark.id}))
+
+        # Deleting a list moves its bookmarks out of it.
+        self.client.delete(f"/api/lists/{self.list1.id}/")
+        changes, token = self.get_changes(token)
+        self.assertEqual(
+            changes, (set(), {self.bookmarks[3].id}, {self.list1.id}, set())
+        )
+
+        self.client.delete(f"/api/lists/{self.list2.id}/include-related/")
+        changes, token = self.get_changes(token)
+        self.assertEqual(
+            changes,
+            (
+                set(),
+                set(),
+                {self.list2.id},
+                {self.bookmarks[1].id, self.bookmarks[4].id},
+            ),
+        )
+
+        # The user's other bookmarks are deleted along with the user.
+        user_id = self.user.id
+        self.user.delete()
+        self.assertEqual(
+            set(
+                Tombstone.objects.filter(
+                    user_id=user_id, model=Tombstone.BOOKMARK
+                ).values_list("object_id", flat=True)
+            ),
+            {bookmark.id for bookmark in self.bookmarks},
+        )
+
+    def test_pages(self):
+        List.objects.filter(id=self.list1.id).delete()
+        Bookmark.objects.filter(id=self.bookmarks[5].id).update(name="Renamed")
+        expected = self.sync()
+        for limit in (1, 2, 5):
+            with self.subTest(limit=limit):
+                data = self.sync(limit=limit)
+                pages = [data]
+                while data["more"]:
+                    data = self.sync(data["token"], limit=limit)
+                    self.assertLessEqual(
+                        len(data["lists"])
+                        + len(data["bookmarks"])
+                        + len(data["deleted"]["lists"]),
+                        limit,
+                    )
+                    pages.append(data)
+                self.assertEqual(
+                    [item for page in pages for item in page["lists"]],
+                    expected["lists"],
+                )
+                self.assertEqual(
+                    [item for page in pages for item in page["bookmarks"]],
+                    expected["bookmarks"],
+                )
+                self.assertEqual(
+                    [item for page in pages for item in page["deleted"]["lists"]],
+                    [self.list1.id],
+                )
+
+    def test_invalid_token(self):
+        for token in ("x", "1.2.3", "1.5.3.4", "-1.0.0.0", f"1.0.{2**63}.0"):
+            with self.subTest(token=token):
+                response = self.client.get("/api/sync/", {"since": token})
+                self.assertEqual(response.status_code, 400)
+
+    def test_expired_token(self):
+        old = timezone.now() - timedelta(days=31)
+        token = sync.make_token(sync.START, old)
+        response = self.client.get("/api/sync/", {"since": token})
+        self.assertEqual(response.status_code, 410)
+
+    def test_purge(self):
+        Bookmark.objects.filter(id=self.bookmarks[0].id).delete()
+        Bookmark.objects.filter(id=self.bookmarks[1].id).delete()
+        Tombstone.objects.filter(object_id=self.bookmarks[0].id).update(
+            datetime_deleted=timezone.now() - timedelta(days=31)
+        )
+        stdout = StringIO()
+        call_command("purge_tombstones", stdout=stdout)
+        self.assertIn("Deleted 1 tombstones", stdout.getvalue())
+        self.assertEqual(
+            list(Tombstone.objects.values_list("object_id", flat=True)),
+            [self.bookmarks[1].id],
+        )
@@ -0,0 +1,227 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from bookmarker.frecency import combine, get_frecency
+from bookmarker.models import Bookmark, BookmarkVisit, User, UserDataVersion
+from bookmarker.visits import flush_visits
+from bookmarker.tests.base import TwoUsersTestCase
+
+
+class GoTests(TwoUsersTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bookmark = Bookmark.objects.create(
+            name="Page", url="https://example.com/page?a=1", user=self.user
+        )
+
+    def test_go(self):
+        # User and the statement that records the visit. The session is cached when
+        # logging in.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                f"/go/{self.bookmark.id}/", HTTP_SEC_FETCH_SITE="same-origin"
+            )
+        self.assertRedirects(
+            response, "https://example.com/page?a=1", fetch_redirect_response=False
+        )
+        self.assertIn("no-store", response["Cache-Control"])
+        self.bookmark.refresh_from_db()
+        self.assertFalse(self.bookmark.unread)
+
+    def test_go_read(self):
+        # Following a bookmark that is already read does not write to it, so cached
+        # responses of the user's bookmarks stay valid.
+        Bookmark.objects.filter(id=self.bookmark.id).update(unread=False)
+        version = UserDataVersion.get(self.user.id)
+        response = self.client.get(
+            f"/go/{self.bookmark.id}/", HTTP_SEC_FETCH_SITE="same-origin"
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(UserDataVersion.get(self.user.id), version)
+
+    def test_go_without_sec_fetch_site(self):
+        for headers in (
+            {"HTTP_REFERER": "http://testserver/library/"},
+            {"HTTP_ORIGIN": "http://testserver"},
+        ):
+            with self.subTest(headers=headers):
+                BookmarkVisit.objects.all().delete()
+                self.client.get(f"/go/{self.bookmark.id}/", **headers)
+                self.assertEqual(BookmarkVisit.objects.count(), 1)
+
+    def test_go_cross_site(self):
+        for headers in (
+            {"HTTP_SEC_FETCH_SITE": "cross-site"},
+            {"HTTP_SEC_FETCH_SITE": "same-site", "HTTP_REFERER": "http://testserver/"},
+            {"HTTP_REFERER": "http://example.com/"},
+            {"HTTP_REFERER": "https://testserver/"},
+            {"HTTP_ORIGIN": "null"},
+            {},
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get(f"/go/{self.bookmark.id}/", **headers)
+                self.assertRedirects(
+                    response,
+                    "https://example.com/page?a=1",
+                    fetch_redirect_response=False,
+                )
+        self.bookmark.refresh_from_db()
+        self.assertTrue(self.bookmark.unread)
+        self.assertFalse(BookmarkVisit.objects.exists())
+
+    def test_go_other_user(self):
+        self.client.force_login(self.user2)
+        response = self.client.get(
+            f"/go/{self.bookmark.id}/", HTTP_SEC_FETCH_SITE="same-origin"
+        )
+        self.assertEqual(response.status_code, 404)
+        self.bookmark.refresh_from_db()
+        self.assertTrue(self.bookmark.unread)
+
+    def test_go_logged_out(self):
+        self.client.logout()
+        response = self.client.get(
+            f"/go/{self.bookmark.id}/", HTTP_SEC_FETCH_SITE="same-origin"
+        )
+        self.assertRedirects(response, "/login/", fetch_redirect_response=False)
+        self.bookmark.refresh_from_db()
+        self.assertTrue(self.bookmark.unread)
+
+
+class FrecencyTests(SimpleTestCase):
+    def test_frecency(self):
+        now = timezone.now()
+        days = [now - timedelta(days=i) for i in range(100)]
+        self.assertAlmostEqual(get_frecency([now] * 2), get_frecency([days[30]]) + 60)
+        self.assertAlmostEqual(
+            combine(get_frecency(days[:50]), get_frecency(days[50:])),
+            get_frecency(days),
+        )
+        # Frequent visits outrank a single recent one until they are old enough.
+        self.assertGreater(get_frecency([days[30]] * 10), get_frecency([now]))
+        self.assertLess(get_frecency([days[60]] * 3), get_frecency([now]))
+
+
+class FlushVisitsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        self.bookmark1, self.bookmark2 = Bookmark.objects.bulk_create(
+            Bookmark(name=f"Bookmark{i}", url="https://example.com", user=self.user)
+            for i in (1, 2)
+        )
+        self.client.force_login(self.user)
+
+    def test_go_records_visit(self):
+        self.client.get(f"/go/{self.bookmark1.id}/", HTTP_SEC_FETCH_SITE="same-origin")
+        visit = BookmarkVisit.objects.get()
+        self.assertEqual(visit.bookmark_id, self.bookmark1.id)
+        self.bookmark1.refresh_from_db()
+        self.assertEqual(self.bookmark1.visit_count, 0)
+
+    def test_flush(self):
+        now = timezone.now()
+        BookmarkVisit.objects.bulk_create(
+            [
+                BookmarkVisit(bookmark_id=self.bookmark1.id, datetime=now),
+                BookmarkVisit(
+                    bookmark_id=self.bookmark1.id, datetime=now - timedelta(hours=1)
+                ),
+                BookmarkVisit(
+                    bookmark_id=self.bookmark2.id, datetime=now - timedelta(days=1)
+                ),
+                # The bookmark has been deleted since.
+                BookmarkVisit(bookmark_id=self.bookmark2.id + 1000, datetime=now),
+            ]
+        )
+        # Deleting the visits and the single UPDATE.
+        with self.assertNumQueries(4):
+            self.assertEqual(flush_visits(), (4, 3))
+        self.assertFalse(BookmarkVisit.objects.exists())
+        self.bookmark1.refresh_from_db()
+        self.assertEqual(self.bookmark1.visit_count, 2)
+        self.assertEqual(self.bookmark1.datetime_last_visited, now)
+        self.bookmark2.refresh_from_db()
+        self.assertEqual(self.bookmark2.visit_count, 1)
+        self.assertEqual(self.bookmark2.datetime_last_visited, now - timedelta(days=1))
+
+        # Older visits that are flushed later do not move the last visit back.
+        BookmarkVisit.objects.create(
+            bookmark_id=self.bookmark1.id, datetime=now - timedelta(days=2)
+        )
+        self.assertEqual(flush_visits(), (1, 1))
+        self.bookmark1.refresh_from_db()
+        self.assertEqual(self.bookmark1.visit_count, 3)
+        self.assertEqual(self.bookmark1.datetime_last_visited, now)
+        self.assertAlmostEqual(
+            self.bookmark1.frecency,
+            get_frecency(
+                [
+                    self.bookmark1.datetime_created,
+                    now,
+                    now - timedelta(hours=1),
+                    now - timedelta(days=2),
+                ]
+            ),
+        )
+        self.assertEqual(flush_visits(), (0, 0))
+
+    def test_command(self):
+        BookmarkVisit.objects.bulk_create(
+            BookmarkVisit(bookmark_id=self.bookmark1.id) for _ in range(5)
+        )
+        stdout = StringIO()
+        call_command("flush_visits", "--once", "--batch-size", "2", stdout=stdout)
+        self.assertIn("Added 2 visits to 1 bookmarks", stdout.getvalue())
+        self.assertFalse(BookmarkVisit.objects.exists())
+        self.bookmark1.refresh_from_db()
+        self.assertEqual(self.bookmark1.visit_count, 5)
+
+
+class VisitOrderingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="12345", is_confirmed=True
+        )
+        now = timezone.now()
+        Bookmark.objects.bulk_create(
+            Bookmark(
+                name=f"Bookmark{i}",
+                url="https://example.com",
+                user=self.user,
+                visit_count=i % 3,
+                datetime_last_visited=now - timedelta(days=i % 3) if i % 3 else None,
+            )
+            for i in range(10)
+        )
+        self.client.force_login(self.user)
+
+    def get_all(self, ordering, page_size):
+        response = self.client.get(
+            "/api/bookmarks/", {"ordering": ordering, "page_size": page_size}
+        )
+        names = [bookmark["name"] for bookmark in response.data["results"]]
+        while response.data["next"] and len(names) <= 10:
+            response = self.client.get(response.data["next"])
+            names += [bookmark["name"] for bookmark in response.data["results"]]
+        return names
+
+    def test_ordering(self):
+        # Half of the bookmarks have never been visited, so pages have to continue
+        # past rows where datetime_last_visited is null.
+        for field in ("visit_count", "datetime_last_visited", "frecency"):
+            for ordering in (field, "-" + field):
+                tiebreaker = "-id" if ordering.startswith("-") else "id"
+                expected = [
+                    bookmark.name
+                    for bookmark in Bookmark.objects.order_by(ordering, tiebreaker)
+                ]
+                for page_size in (1, 3, 4):
+                    with self.subTest(ordering=ordering, page_size=page_size):
+                        self.assertEqual(self.get_all(ordering, page_size), expected)
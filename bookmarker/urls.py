@@ -1,4 +1,4 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 from . import views
@@ -20,7 +20,15 @@ urlpatterns = [
     path("api/logout/", views.logout_user_view),
     path("api/register/", views.register_user_view),
     path("api/confirmed-status/", views.get_user_confirmed_status),
+    path("api/sync/", views.SyncView.as_view()),
+    path("api/events/", views.events_view),
     path("api/", include(router.urls)),
+    path("go/<int:bookmark_id>/", views.go_view, name="go"),
     path("", views.MainView.as_view(), name="index"),
+    re_path(
+        r"^(?:(?P<list_id>\d+)/)?(?P<url>https?:/.*)$",
+        views.quick_save_view,
+        name="quick-save",
+    ),
     path(r"<path:resource>", views.MainView.as_view(), name="for_app"),
 ]
@@ -1,25 +1,56 @@
+import copy
+import hashlib
+import re
+from urllib.parse import urlencode, urlsplit
+
 from django.contrib.auth import authenticate, login, logout
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
 from django.core.validators import validate_email
-from django.db import IntegrityError
-from django.http import Http404, JsonResponse
-from django.shortcuts import get_object_or_404, redirect
+from django.db import IntegrityError, transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    QueryDict,
+    StreamingHttpResponse,
+)
+from django.middleware.csrf import get_token
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.crypto import get_random_string
+from django.utils.encoding import iri_to_uri
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import TemplateView
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
 from rest_framework import permissions
+from rest_framework import serializers
 from rest_framework import status
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from bookmarker.models import Bookmark, EmailConfirmationToken, List, User
+from bookmarker import events, exporters, suggestions, sync
+from bookmarker.deletion import delete_scheduled_account
+from bookmarker.filters import FullTextSearchFilter, OrderingFilter
+from bookmarker.importers import BookmarkImporter
+from bookmarker.jobs import enqueue
+from bookmarker.models import (
+    Bookmark,
+    EmailConfirmationToken,
+    List,
+    Tombstone,
+    UnfiledBookmarkCount,
+    User,
+    UserDataVersion,
+)
+from bookmarker.outbox import queue_email
+from bookmarker.pagination import KeysetPagination
 from bookmarker.serializers import BookmarkSerializer, ListSerializer, UserSerializer
 
 
@@ -32,7 +63,26 @@ class IsConfirmed(permissions.BasePermission):
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        return obj.user_id == request.user.id
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    Leaves the "format" query parameter to the export view, which streams its own
+    response. Errors are still rendered as JSON.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def get_limit(request, default, maximum):
+    # Invalid values get the default instead of an error.
+    try:
+        limit = int(request.query_params.get("limit", default))
+    except ValueError:
+        return default
+    return min(limit, maximum) if limit > 0 else default
 
 
 class ViewSet(viewsets.ModelViewSet):
@@ -42,15 +92,100 @@ class ViewSet(viewsets.ModelViewSet):
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        FullTextSearchFilter,
+        OrderingFilter,
     ]
+    pagination_class = KeysetPagination
+
+    # Lists with more results than this are not cached, so that one large account
+    # cannot fill the cache.
+    response_cache_max_results = 2000
 
     def get_queryset(self):
         return super().get_queryset().filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        self.publish_change("created", serializer.instance.id, serializer.data)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.publish_change("updated", serializer.instance.id, serializer.data)
+
+    def perform_destroy(self, instance):
+        instance_id = instance.id
+        super().perform_destroy(instance)
+        self.publish_change("deleted", instance_id)
+
+    def publish_change(self, change, object_id, data=None):
+        # Sent to the user's open event streams once the change commits.
+        events.publish_change(
+            self.request.user.id,
+            change,
+            self.queryset.model._meta.model_name,
+            object_id,
+            data,
+            events.get_origin(self.request),
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(self.cached_list, request, *args, **kwargs)
+
+    def cached_list(self, request, *args, **kwargs):
+        """
+        Returns the serialized results of a previous identical request if none of the
+        user's bookmarks or lists have changed since. Entries are keyed by the user's
+        data version, so every write invalidates them, whether it was made through the
+        API, the admin or a bulk query. Outdated entries are left to be evicted.
+        """
+        cache = caches["responses"]
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        results = response.data
+        if isinstance(results, dict):
+            results = results.get("results", ())
+        if len(results) <= self.response_cache_max_results:
+            cache.set(key, response.data)
+        return response
+
+    def get_cache_key(self, request):
+        # Pagination links contain the host, so it is part of the key.
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.sha256(
+            f"{request.get_host()}{request.path}?{params}".encode()
+        ).hexdigest()
+        return f"{self.basename}:{request.user.id}:{self.data_version}:{digest}"
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_etag(self, request):
+        # The version is read before the main query, so a write that is committed in
+        # between is seen by the next request instead of being hidden by this ETag.
+        self.data_version = UserDataVersion.get(request.user.id)
+        return (
+            f'"{request.user.id}-{self.data_version}-'
+            f'{request.accepted_renderer.format}"'
+        )
+
+    def get_conditional_response(self, method, request, *args, **kwargs):
+        """
+        Answers If-None-Match with 304 Not Modified when none of the user's bookmarks
+        or lists have changed, without running the main query. Responses are marked
+        to be revalidated every time, which browsers do with If-None-Match.
+        """
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = method(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class BookmarkViewSet(ViewSet):
@@ -58,8 +193,316 @@ class BookmarkViewSet(ViewSet):
     serializer_class = BookmarkSerializer
     filterset_fields = ["unread", "list"]
     search_fields = ["name", "url"]
-    ordering_fields = ["name", "url"]
+    search_vector_field = "search_vector"
+    ordering_fields = [
+        "name",
+        "url",
+        "visit_count",
+        "datetime_last_visited",
+        "frecency",
+    ]
     ordering = ["name"]
+    max_batch_size = 1000
+    suggestion_limit = 10
+    max_suggestion_limit = 50
+
+    def create(self, request, *args, **kwargs):
+        """
+        With "on_duplicate=reject" or "on_duplicate=update", a bookmark of a page that
+        the user has already saved (under any URL with the same canonical form) is not
+        created again. Instead, the response is 409 Conflict with the existing
+        bookmark, or the existing bookmark is updated with the given fields.
+        """
+        on_duplicate = request.query_params.get("on_duplicate")
+        if on_duplicate is None:
+            return super().create(request, *args, **kwargs)
+        if on_duplicate not in ("reject", "update"):
+            return Response(
+                {"detail": 'on_duplicate must be "reject" or "update".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        url = serializer.validated_data["url"]
+        with transaction.atomic():
+            Bookmark.objects.lock_url(url)
+            existing = self.get_queryset().find_url(url)
+            if not existing:
+                self.perform_create(serializer)
+                return Response(
+                    serializer.data,
+                    status=status.HTTP_201_CREATED,
+                    headers=self.get_success_headers(serializer.data),
+                )
+            if on_duplicate == "reject":
+                return Response(
+                    {
+                        "detail": "A bookmark of this URL already exists.",
+                        "bookmark": self.get_serializer(existing[0]).data,
+                    },
+                    status=status.HTTP_409_CONFLICT,
+                )
+            serializer = self.get_serializer(
+                existing[0], data=request.data, partial=True
+            )
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def suggest(self, request):
+        """
+        Returns the user's bookmarks whose name (from the start of any word) or host
+        starts with the "q" query parameter, most relevant first. This is meant to be
+        called on every keystroke, so results come from an index of the user's
+        bookmarks that is kept in memory (see bookmarker.suggestions).
+        """
+        prefix = request.query_params.get("q", "").strip()
+        if not prefix:
+            return Response([])
+        limit = get_limit(request, self.suggestion_limit, self.max_suggestion_limit)
+        return Response(
+            suggestions.suggest(
+                self.get_queryset(),
+                request.user.id,
+                UserDataVersion.get(request.user.id),
+                prefix,
+                limit,
+            )
+        )
+
+    @action(detail=False, methods=["get"])
+    def lookup(self, request):
+        """
+        Returns the user's bookmarks of the page at the "url" query parameter, under
+        any URL with the same canonical form.
+        """
+        url = request.query_params.get("url")
+        if not url:
+            return Response(
+                {"url": ["This field is required."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        errors = get_url_errors(url)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        bookmarks = self.get_queryset().find_url(url)
+        return Response(self.get_serializer(bookmarks, many=True).data)
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """
+        Applies a list of create, update and delete operations in one transaction.
+        Each operation looks like {"op": "create", "data": {...}},
+        {"op": "update", "id": 1, "data": {...}} or {"op": "delete", "id": 1}.
+
+        If any operation is invalid, nothing is applied and the response has the
+        errors of each failed operation. Otherwise, the response has the result of
+        each operation, in the same order.
+        """
+        operations = request.data
+        if not isinstance(operations, list) or not all(
+            isinstance(operation, dict) for operation in operations
+        ):
+            return Response(
+                {"detail": "Expected a list of operations"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(operations) > self.max_batch_size:
+            return Response(
+                {"detail": f"No more than {self.max_batch_size} operations allowed"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Every list and bookmark referenced by the batch is loaded up front, so that
+        # validating the whole batch takes two queries.
+        list_ids = set()
+        bookmark_ids = set()
+        for operation in operations:
+            data = operation.get("data")
+            if isinstance(data, dict) and isinstance(data.get("list"), (int, str)):
+                list_ids.add(data["list"])
+            if isinstance(operation.get("id"), (int, str)):
+                bookmark_ids.add(operation["id"])
+        context = self.get_serializer_context()
+        context["lists"] = List.objects.in_bulk(self.get_valid_ids(list_ids))
+        bookmarks = self.get_queryset().in_bulk(self.get_valid_ids(bookmark_ids))
+
+        results = []
+        created = []
+        updated = {}
+        update_fields = set()
+        deleted = set()
+        for operation in operations:
+            op = operation.get("op")
+            instance = None
+            if op in ("update", "delete"):
+                try:
+                    instance = bookmarks.get(int(operation.get("id")))
+                except (TypeError, ValueError):
+                    pass
+                if instance is None or instance.id in deleted:
+                    results.append(
+                        {"status": status.HTTP_404_NOT_FOUND, "detail": "Not found."}
+                    )
+                    continue
+
+            if op == "delete":
+                deleted.add(instance.id)
+                results.append({"status": status.HTTP_204_NO_CONTENT})
+            elif op in ("create", "update"):
+                serializer = self.get_serializer_class()(
+                    instance,
+                    data=operation.get("data"),
+                    partial=op == "update",
+                    context=context,
+                )
+                if not serializer.is_valid():
+                    results.append(
+                        {
+                            "status": status.HTTP_400_BAD_REQUEST,
+                            "errors": serializer.errors,
+                        }
+                    )
+                    continue
+                if op == "create":
+                    instance = Bookmark(user=request.user, **serializer.validated_data)
+                    created.append(instance)
+                    results.append(
+                        {"status": status.HTTP_201_CREATED, "instance": instance}
+                    )
+                else:
+                    for field, value in serializer.validated_data.items():
+                        setattr(instance, field, value)
+                    updated[instance.id] = instance
+                    update_fields.update(serializer.validated_data)
+                    results.append({"status": status.HTTP_200_OK, "instance": instance})
+            else:
+                results.append(
+                    {
+                        "status": status.HTTP_400_BAD_REQUEST,
+                        "detail": 'Operation must be "create", "update" or "delete".',
+                    }
+                )
+
+        if any(result["status"] >= 400 for result in results):
+            for result in results:
+                if result["status"] < 400:
+                    result.clear()
+                    result["status"] = status.HTTP_424_FAILED_DEPENDENCY
+                    result["detail"] = "Not applied because another operation failed."
+            return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        # An update followed by a delete of the same bookmark only needs the delete.
+        updated = [
+            instance for instance in updated.values() if instance.id not in deleted
+        ]
+        with transaction.atomic():
+            if created:
+                Bookmark.objects.bulk_create(created)
+            if updated:
+                Bookmark.objects.bulk_update(updated, update_fields)
+            if deleted:
+                Bookmark.objects.filter(id__in=deleted).delete()
+            if created or updated or deleted:
+                events.publish(
+                    request.user.id, events.CHANGED, events.get_origin(request)
+                )
+
+        for result in results:
+            instance = result.pop("instance", None)
+            if instance is not None:
+                result["data"] = self.get_serializer(instance).data
+        return Response({"results": results})
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_bookmarks(self, request):
+        """
+        Imports an uploaded browser export. Bookmarks that are not in any folder are
+        put into the optional "list".
+        """
+        file = request.FILES.get("file")
+        if file is None:
+            return Response(
+                {"detail": "No file was submitted."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = self.get_serializer(
+            data={"list": request.data.get("list") or None}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+
+        importer = BookmarkImporter(
+            request.user, default_list=serializer.validated_data.get("list")
+        )
+        try:
+            importer.import_file(file, request.data.get("format") or None)
+        except ValueError as e:
+            return Response(
+                {"detail": str(e), "created": importer.created},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        finally:
+            if importer.created or importer.lists_created:
+                events.publish(
+                    request.user.id, events.CHANGED, events.get_origin(request)
+                )
+        return Response(
+            {
+                "created": importer.created,
+                "lists_created": importer.lists_created,
+                "skipped": importer.skipped,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        content_negotiation_class=ExportContentNegotiation,
+    )
+    def export(self, request):
+        """
+        Streams all of the user's bookmarks as JSON, CSV or Netscape bookmark HTML,
+        depending on the "format" query parameter. The filters of the list endpoint
+        can be used to export only some bookmarks.
+        """
+        export_format = request.query_params.get("format", "json")
+        queryset = self.filter_queryset(self.get_queryset())
+        if export_format == "json":
+            content = exporters.export_json(queryset)
+            content_type = "application/json"
+        elif export_format == "csv":
+            content = exporters.export_csv(queryset)
+            content_type = "text/csv; charset=utf-8"
+        elif export_format == "html":
+            lists = dict(
+                List.objects.filter(user=request.user).values_list("id", "name")
+            )
+            content = exporters.export_html(queryset, lists)
+            content_type = "text/html; charset=utf-8"
+        else:
+            return Response(
+                {"detail": 'Format must be "json", "csv" or "html".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="bookmarks.{export_format}"'
+        )
+        return response
+
+    @staticmethod
+    def get_valid_ids(ids):
+        valid_ids = set()
+        for value in ids:
+            try:
+                value = int(value)
+            except ValueError:
+                continue
+            if 0 < value < 2**63:
+                valid_ids.add(value)
+        return valid_ids
 
 
 class ListViewSet(ViewSet):
@@ -72,10 +515,37 @@ class ListViewSet(ViewSet):
     @action(detail=True, methods=["delete"], url_path="include-related")
     def delete_list_and_bookmarks(self, request, pk):
         requested_list = get_object_or_404(self.get_queryset(), id=pk)
-        requested_list.delete_related_bookmarks()
-        requested_list.delete()
+        requested_list.delete_with_bookmarks()
+        # The list's bookmarks are gone too.
+        events.publish(request.user.id, events.CHANGED, events.get_origin(request))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=["get"])
+    def counts(self, request):
+        return self.get_conditional_response(self.get_counts, request)
+
+    def get_counts(self, request):
+        """
+        Returns the number of bookmarks and of unread bookmarks in each of the user's
+        lists and in no list. These are read from counters that the database keeps up
+        to date, so no bookmarks are counted.
+        """
+        unfiled = (
+            UnfiledBookmarkCount.objects.filter(user_id=request.user.id)
+            .values("bookmark_count", "unread_count")
+            .first()
+        )
+        return Response(
+            {
+                "lists": list(
+                    self.get_queryset()
+                    .order_by("id")
+                    .values("id", "bookmark_count", "unread_count")
+                ),
+                "unfiled": unfiled or {"bookmark_count": 0, "unread_count": 0},
+            }
+        )
+
 
 class UserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -85,6 +555,85 @@ class UserView(APIView):
         user_serialized = UserSerializer(request.user)
         return Response(user_serialized.data)
 
+    def delete(self, request, format=None):
+        # pylint: disable=redefined-builtin, unused-argument
+        with transaction.atomic():
+            request.user.schedule_deletion()
+            enqueue(delete_scheduled_account, request.user.id)
+        logout(request)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+
+class SyncView(APIView):
+    """
+    Returns the user's lists and bookmarks that have changed and the IDs of those that
+    have been deleted since the "since" token of a previous response, in the order of
+    the changes. Without a token, all of them are returned. Clients apply
+    the changes, save the new token and repeat while "more" is true.
+
+    A token older than the tombstone lifetime gets 410 Gone, since deletions from
+    before then may have been forgotten, and the client has to start over.
+    """
+
+    permission_classes = [IsConfirmed]
+    sync_limit = 500
+    max_sync_limit = 2000
+
+    def get(self, request, format=None):
+        # pylint: disable=redefined-builtin, unused-argument
+        issued = timezone.now()
+        position = sync.START
+        since = request.query_params.get("since")
+        if since:
+            try:
+                position, since_issued = sync.parse_token(since)
+            except ValueError:
+                return Response(
+                    {"since": ["Invalid token."]}, status=status.HTTP_400_BAD_REQUEST
+                )
+            if sync.is_expired(since_issued):
+                return Response(
+                    {"detail": "Token has expired. Sync again without it."},
+                    status=status.HTTP_410_GONE,
+                )
+        limit = get_limit(request, self.sync_limit, self.max_sync_limit)
+        changes, position, more = sync.get_changes(request.user.id, position, limit)
+        lists = [obj for obj in changes if isinstance(obj, List)]
+        bookmarks = [obj for obj in changes if isinstance(obj, Bookmark)]
+        tombstones = [obj for obj in changes if isinstance(obj, Tombstone)]
+        response = Response(
+            {
+                "lists": ListSerializer(lists, many=True).data,
+                "bookmarks": BookmarkSerializer(bookmarks, many=True).data,
+                "deleted": {
+                    "lists": [
+                        obj.object_id
+                        for obj in tombstones
+                        if obj.model == Tombstone.LIST
+                    ],
+                    "bookmarks": [
+                        obj.object_id
+                        for obj in tombstones
+                        if obj.model == Tombstone.BOOKMARK
+                    ],
+                },
+                "token": sync.make_token(position, issued),
+                "more": more,
+            }
+        )
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+
+@require_GET
+def events_view(request):
+    """
+    Answers requests for the event stream that are not served by EventStream, which
+    needs the ASGI application in project/asgi.py. Browsers stop reconnecting to an
+    event stream that responds with 204 No Content.
+    """
+    return HttpResponse(status=204)
+
 
 @ensure_csrf_cookie
 def set_csrf_cookie(request):
@@ -110,7 +659,9 @@ def register_user_view(request):
     password = str(data.get("password"))
     try:
         validate_email(email)
-        user = User.objects.create_user(email=email, password=password)
+        with transaction.atomic():
+            user = User.objects.create_user(email=email, password=password)
+            send_user_confirmation(request, user)
     except (ValidationError, ValueError) as e:
         return JsonResponse(
             {"detail": "Invalid email or password", "error": str(e)}, status=400
@@ -120,7 +671,6 @@ def register_user_view(request):
             {"detail": "An account with this email already exists"}, status=400
         )
     login(request, user)
-    send_user_confirmation(request, user)
     return JsonResponse({"detail": "Success"}, status=201)
 
 
@@ -131,25 +681,27 @@ def logout_user_view(request):
 
 
 def send_user_confirmation(request, user):
+    # The email is queued in the same transaction as the token and sent later by the
+    # send_emails command.
     host = request.get_host()
     host_without_port = host.split(":")[0]
-    token = EmailConfirmationToken.objects.get_or_create(
-        user=user, defaults={"token": get_random_string(length=100)}
-    )[0]
-    link = (
-        "http://"
-        + host
-        + reverse("confirm-user", kwargs={"user_id": user.id, "token_str": token})
-    )
+    with transaction.atomic():
+        token = EmailConfirmationToken.objects.get_or_create(
+            user=user, defaults={"token": get_random_string(length=100)}
+        )[0]
+        link = (
+            "http://"
+            + host
+            + reverse("confirm-user", kwargs={"user_id": user.id, "token_str": token})
+        )
 
-    message_body = f"Please go to this address to confirm your email:\n{link}"
-    send_mail(
-        "Email Confirmation",
-        message_body,
-        f"noreply@{host_without_port}",
-        [user.email],
-        fail_silently=True,
-    )
+        message_body = f"Please go to this address to confirm your email:\n{link}"
+        queue_email(
+            "Email Confirmation",
+            message_body,
+            f"noreply@{host_without_port}",
+            user.email,
+        )
 
 
 @require_POST
@@ -172,7 +724,7 @@ def confirm_user_view(request, user_id, token_str):
     if user is None:
         raise Http404()
     user.is_confirmed = True
-    user.save()
+    user.save(update_fields=["is_confirmed"])
     return redirect("/confirmed/")
 
 
@@ -185,5 +737,199 @@ def get_user_confirmed_status(request):
     )
 
 
+def get_view_data(view, request, path, params):
+    """
+    Calls an API view with a GET request for path, made from the given request, and
+    returns the data of its response, or None if it did not succeed.
+    """
+    api_request = copy.copy(request)
+    api_request.method = "GET"
+    api_request.path = api_request.path_info = path
+    api_request.GET = QueryDict(urlencode(params))
+    api_request.META = {
+        key: value
+        for key, value in request.META.items()
+        if key not in ("HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
+    }
+    api_request.META["QUERY_STRING"] = urlencode(params)
+    response = view(api_request)
+    if response.status_code != status.HTTP_200_OK:
+        return None
+    return response.data
+
+
 class MainView(TemplateView):
+    """
+    Serves the app. For logged in users, the data that the app would otherwise
+    request before showing anything is embedded in the page as JSON: the CSRF token,
+    the user and, for confirmed users, their lists, the counts of their bookmarks and,
+    on the library page, the first bookmarks_page_size bookmarks that the library
+    shows, which it follows with the rest. The data comes from the same views that
+    the app would request it from.
+    """
+
     template_name = "bookmarker/index.html"
+    embed_data = True
+    library_path = "/app/"
+    bookmarks_page_size = 100
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.embed_data and self.request.user.is_authenticated:
+            context["data"] = self.get_data()
+        return context
+
+    def get_data(self):
+        request = self.request
+        data = {
+            "csrf_token": get_token(request),
+            "user": UserSerializer(request.user).data,
+        }
+        if not request.user.is_confirmed:
+            return data
+
+        lists_view = ListViewSet.as_view({"get": "list"})
+        counts_view = ListViewSet.as_view({"get": "counts"})
+        data["lists"] = get_view_data(lists_view, request, "/api/lists/", {})
+        data["counts"] = get_view_data(counts_view, request, "/api/lists/counts/", {})
+        if request.path == self.library_path:
+            # The same request as the library makes for the filters in its query.
+            filters = {
+                key: request.GET[key]
+                for key in ("list", "unread", "search")
+                if key in request.GET
+            }
+            params = {key: value for key, value in filters.items() if value}
+            if "unread" in params:
+                params["unread"] = "true"
+            params["page_size"] = self.bookmarks_page_size
+            bookmarks_view = BookmarkViewSet.as_view({"get": "list"})
+            data["bookmarks"] = {
+                "filters": filters,
+                "data": get_view_data(
+                    bookmarks_view, request, "/api/bookmarks/", params
+                ),
+            }
+        return data
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if context.get("data"):
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def is_same_origin(request):
+    site = request.headers.get("Sec-Fetch-Site")
+    if site is not None:
+        return site in ("none", "same-origin")
+    # Browsers that do not send Sec-Fetch-Site still send the Origin or Referer of
+    # requests from the app, since the default SECURE_REFERRER_POLICY is same-origin.
+    source = request.headers.get("Origin") or request.headers.get("Referer")
+    if not source:
+        return False
+    parts = urlsplit(source)
+    return parts.scheme == request.scheme and parts.netloc == request.get_host()
+
+
+@require_GET
+def go_view(request, bookmark_id):
+    """
+    Redirects to the URL of one of the user's bookmarks, recording the visit and
+    marking it as read on the way. Links in the app point here instead of to the
+    bookmarks themselves, so following one does not wait for a separate request to
+    update the bookmark.
+
+    Only navigations from the app or that the user started directly write anything.
+    Requests from other sites, which could be made with an image, are only redirected.
+    """
+    if not request.user.is_authenticated:
+        return redirect("/login/")
+    bookmarks = Bookmark.objects.filter(user=request.user)
+    if is_same_origin(request):
+        url, marked_read = bookmarks.visit(bookmark_id) or (None, False)
+    else:
+        url = bookmarks.filter(id=bookmark_id).values_list("url", flat=True).first()
+        marked_read = False
+    if url is None:
+        raise Http404()
+    if marked_read:
+        events.publish_change(request.user.id, "updated", "bookmark", bookmark_id)
+    response = redirect(url)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+def get_url_errors(url):
+    # URLs have to be valid to be canonicalized by find_url.
+    try:
+        BookmarkSerializer().fields["url"].run_validation(url)
+    except serializers.ValidationError as e:
+        return {"url": e.detail}
+    return None
+
+
+def get_default_bookmark_name(url):
+    parts = urlsplit(url)
+    name = (parts.netloc + parts.path).rstrip("/") or url
+    return name[: Bookmark._meta.get_field("name").max_length]
+
+
+@require_GET
+def quick_save_view(request, url, list_id=None):
+    """
+    Saves the URL that follows the host in the path (optionally after the ID of a
+    list) as a bookmark with a single INSERT, unless the user has already saved it, and
+    responds with a small page instead of the app.
+
+    Since this is a GET request, only navigations that the user started directly,
+    such as by typing the address, save anything. Requests from other sites, from
+    browsers that do not send Sec-Fetch-Site and from users that are not logged in get
+    the app's form for saving the bookmark instead.
+    """
+    # Some proxies merge the slashes after the scheme.
+    url = iri_to_uri(re.sub(r"^(https?:)/+", r"\1//", url))
+    if request.META.get("QUERY_STRING"):
+        url += "?" + request.META["QUERY_STRING"]
+
+    user = request.user
+    if not (user.is_authenticated and user.is_confirmed) or request.headers.get(
+        "Sec-Fetch-Site"
+    ) not in ("none", "same-origin"):
+        if list_id is not None:
+            return redirect("/" + url)
+        return MainView.as_view()(request)
+
+    errors = get_url_errors(url)
+    if errors:
+        return render(
+            request,
+            "bookmarker/saved.html",
+            {"url": url, "errors": errors},
+            status=400,
+        )
+
+    existing = Bookmark.objects.filter(user=user).find_url(url)
+    if existing:
+        return render(
+            request,
+            "bookmarker/saved.html",
+            {"url": url, "bookmark": existing[0], "already_saved": True},
+        )
+
+    serializer = BookmarkSerializer(
+        data={"name": get_default_bookmark_name(url), "url": url, "list": list_id},
+        context={"request": request},
+    )
+    if not serializer.is_valid():
+        return render(
+            request,
+            "bookmarker/saved.html",
+            {"url": url, "errors": serializer.errors},
+            status=400,
+        )
+    bookmark = serializer.save(user=user)
+    events.publish_change(user.id, "created", "bookmark", bookmark.id, serializer.data)
+    return render(
+        request, "bookmarker/saved.html", {"url": url, "bookmark": bookmark}, status=201
+    )
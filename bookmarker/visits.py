@@ -0,0 +1,49 @@
+from django.db import connection, transaction
+
+from bookmarker.frecency import DECAY_RATE, get_frecency
+from bookmarker.models import Bookmark, BookmarkVisit
+
+
+def flush_visits(batch_size=1000):
+    # Locked visits belong to another flush and are skipped.
+    visit_table = BookmarkVisit._meta.db_table
+    table = Bookmark._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM "{visit_table}" WHERE "id" IN ('
+            f'SELECT "id" FROM "{visit_table}" ORDER BY "id" LIMIT %s '
+            f"FOR UPDATE SKIP LOCKED"
+            f') RETURNING "bookmark_id", "datetime"',
+            [batch_size],
+        )
+        visits = cursor.fetchall()
+        if not visits:
+            return 0, 0
+
+        datetimes = {}
+        for bookmark_id, datetime in visits:
+            datetimes.setdefault(bookmark_id, []).append(datetime)
+        # Bookmarks are updated in order of their IDs, so that flushes running at the
+        # same time do not lock them in opposite orders.
+        rows = [
+            (bookmark_id, len(values), max(values), get_frecency(values))
+            for bookmark_id, values in sorted(datetimes.items())
+        ]
+        cursor.execute(
+            f'UPDATE "{table}" SET '
+            f'"visit_count" = "{table}"."visit_count" + "visits"."count", '
+            f'"datetime_last_visited" = GREATEST('
+            f'"{table}"."datetime_last_visited", "visits"."last"), '
+            # The same as frecency.combine().
+            f'"frecency" = GREATEST("{table}"."frecency", "visits"."frecency") + '
+            f'LN(1 + EXP(-%s * ABS("{table}"."frecency" - "visits"."frecency"))) / %s '
+            f"FROM (VALUES "
+            + ", ".join(
+                ["(%s::bigint, %s::integer, %s::timestamptz, %s::double precision)"]
+                * len(rows)
+            )
+            + f') AS "visits" ("id", "count", "last", "frecency") '
+            f'WHERE "{table}"."id" = "visits"."id"',
+            [DECAY_RATE, DECAY_RATE, *(value for row in rows for value in row)],
+        )
+    return len(visits), len(rows)
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 
-application = get_asgi_application()
+# Like get_asgi_application(), with a handler that can serve the exports.
+django.setup(set_prefix=False)
+
+# Imported once Django has been set up.
+# pylint: disable=wrong-import-position
+from bookmarker.events import EventStream  # noqa: E402
+from bookmarker.handlers import StreamingASGIHandler  # noqa: E402
+
+# Streams change events to the app, which needs an ASGI server.
+application = EventStream(StreamingASGIHandler())
@@ -158,6 +158,60 @@ EMAIL_USE_TLS = config("EMAIL_USE_TLS", cast=bool, default=False)
 
 EMAIL_USE_SSL = config("EMAIL_USE_SSL", cast=bool, default=False)
 
+# Responses of the API's list endpoints are cached in the "responses" cache. By
+# default, each process keeps its own least recently used entries in memory. Using
+# django.core.cache.backends.filebased.FileBasedCache with a directory as the location
+# shares the cache between all processes on a server.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "responses": {
+        "BACKEND": config(
+            "RESPONSE_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("RESPONSE_CACHE_LOCATION", default="responses"),
+        "TIMEOUT": config("RESPONSE_CACHE_TIMEOUT", cast=int, default=300),
+        "OPTIONS": {
+            "MAX_ENTRIES": config("RESPONSE_CACHE_MAX_ENTRIES", cast=int, default=1000)
+        },
+    },
+    # Sessions and logged in users are read from the "auth" cache for up to TIMEOUT
+    # seconds. Logging out and changes of users are removed from it right away, so it
+    # has to be shared by every process, which the files of the default backend are.
+    "auth": {
+        "BACKEND": config(
+            "AUTH_CACHE_BACKEND",
+            default="django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": config(
+            "AUTH_CACHE_LOCATION", default=str(Path.home() / ".cache/bookmarker/auth")
+        ),
+        "TIMEOUT": config("AUTH_CACHE_TIMEOUT", cast=int, default=60),
+        "OPTIONS": {
+            "MAX_ENTRIES": config("AUTH_CACHE_MAX_ENTRIES", cast=int, default=10000)
+        },
+    },
+}
+
+SESSION_ENGINE = "bookmarker.sessions"
+SESSION_CACHE_ALIAS = "auth"
+
+AUTHENTICATION_BACKENDS = ["bookmarker.backends.CachedModelBackend"]
+
+TEST_RUNNER = "bookmarker.tests.runner.TestRunner"
+
+# Number of keys (words of bookmark names and hosts) in the bookmark suggestion indexes
+# that each process keeps in memory.
+SUGGESTION_CACHE_MAX_KEYS = config("SUGGESTION_CACHE_MAX_KEYS", cast=int, default=500000)
+
+# Days that deleted bookmarks and lists are remembered for clients of /api/sync/.
+# Clients that have not synced for longer have to fetch everything again.
+SYNC_TOMBSTONE_DAYS = config("SYNC_TOMBSTONE_DAYS", cast=int, default=30)
+
+# Delivers change events to the event streams of bookmarker.events.
+# "bookmarker.events.PostgresBroker" passes them between processes.
+EVENTS_BROKER = config("EVENTS_BROKER", default="bookmarker.events.InProcessBroker")
+
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"]
 }